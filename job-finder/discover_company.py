@@ -10,17 +10,9 @@ Usage:
 import asyncio
 import argparse
 import json
-import re
 from src.api_discovery import discover_company_api
 from src.dynamic_api_scraper import DynamicAPIScraper
-
-
-def slugify(name: str) -> str:
-    """Convert company name to slug."""
-    slug = name.lower()
-    slug = re.sub(r'[^a-z0-9]+', '-', slug)
-    slug = slug.strip('-')
-    return slug
+from src.utils import slugify
 
 
 async def main():
@@ -108,13 +100,13 @@ async def main():
     print("=" * 60)
     print(f"\n📌 Next steps:")
     print(f"1. Add to config.py:")
-    print(f'   {{')
-    print(f'       "name": "{args.name}",')
-    print(f'       "slug": "{company_slug}",')
-    print(f'       "url": "{args.url}",')
-    print(f'       "keywords": ["intern", "internship"],')
-    print(f'       "locations": ["Germany"]')
-    print(f'   }}')
+    print(f'   CompanyConfig(')
+    print(f'       name="{args.name}",')
+    print(f'       slug="{company_slug}",')
+    print(f'       url="{args.url}",')
+    print(f'       keywords=("intern", "internship"),')
+    print(f'       locations=("Germany",),')
+    print(f'   ),')
     print(f"\n2. Run main.py to start scraping automatically!")
 
 
@@ -3,22 +3,21 @@ Main orchestration script for the job alert system.
 Now with automatic API discovery!
 """
 import sys
-import re
 import asyncio
-from src.config import COMPANIES, COMPANY_URLS, JOBS_DATA_FILE, JOB_TYPE_KEYWORDS, JOB_FIELD_KEYWORDS, LOCATION_KEYWORDS
+from src.config import CompanyConfig, COMPANIES, COMPANY_URLS, JOBS_DATA_FILE, JOB_TYPE_KEYWORDS, JOB_FIELD_KEYWORDS, LOCATION_KEYWORDS, MAX_CONCURRENT_COMPANIES
 from src.dynamic_api_scraper import DynamicAPIScraper
 from src.api_discovery import discover_company_api
 from src.comparison import compare_and_update_jobs
-from src.email_sender import send_email
+from src.email_sender import send_email, close_smtp
 from src.async_scraper import scrape_html_async  # Async HTML fallback
+from src.browser_pool import get_browser, close_browser
+from src.api_scraper import create_api_session
+from src.utils import keyword_pattern
 
 
-def slugify(name: str) -> str:
-    """Convert company name to slug."""
-    slug = name.lower()
-    slug = re.sub(r'[^a-z0-9]+', '-', slug)
-    slug = slug.strip('-')
-    return slug
+# Precompiled default filters (one regex scan per title instead of a loop per keyword)
+_TYPE_RE = keyword_pattern(JOB_TYPE_KEYWORDS)
+_FIELD_RE = keyword_pattern(JOB_FIELD_KEYWORDS)
 
 
 def filter_jobs_by_type_and_field(jobs, type_keywords=None, field_keywords=None):
@@ -28,37 +27,24 @@ def filter_jobs_by_type_and_field(jobs, type_keywords=None, field_keywords=None)
     1. At least one job type keyword (intern, working student, etc.)
     2. At least one field keyword (AI, ML, Data Science, etc.)
     """
-    if type_keywords is None:
-        type_keywords = JOB_TYPE_KEYWORDS
-    if field_keywords is None:
-        field_keywords = JOB_FIELD_KEYWORDS
+    type_re = _TYPE_RE if type_keywords is None else keyword_pattern(type_keywords)
+    field_re = _FIELD_RE if field_keywords is None else keyword_pattern(field_keywords)
     
-    filtered = []
+    type_search = type_re.search
+    field_search = field_re.search
     
-    for job in jobs:
-        title_lower = job['title'].lower()
-        
-        # Check if job matches type (intern/working student)
-        matches_type = any(keyword.lower() in title_lower for keyword in type_keywords)
-        
-        # Check if job matches field (AI/ML/Data Science)
-        matches_field = any(keyword.lower() in title_lower for keyword in field_keywords)
-        
-        # Job must match BOTH type AND field
-        if matches_type and matches_field:
-            filtered.append(job)
-    
-    return filtered
+    # Job must match BOTH type (intern/working student) AND field (AI/ML/Data Science)
+    return [job for job in jobs if type_search(job['title']) and field_search(job['title'])]
 
 
-async def scrape_company_async(company, scraper):
+async def scrape_company_async(company, scraper, session):
     """Scrape a single company asynchronously."""
-    name = company['name']
-    slug = company.get('slug', slugify(name))
-    url = company['url']
-    keywords = company.get('keywords', ['intern', 'internship'])
-    locations = company.get('locations', ['Germany'])
-    use_api = company.get('use_api', True)
+    name = company.name
+    slug = company.slug
+    url = company.url
+    keywords = list(company.keywords)
+    locations = list(company.locations)
+    use_api = company.use_api
     
     print(f"\n{'='*60}")
     print(f"🏢 {name}")
@@ -72,11 +58,11 @@ async def scrape_company_async(company, scraper):
         
         if config:
             print(f"✅ Using saved API configuration")
-            jobs = scraper.scrape_jobs(slug, keywords=keywords, location='DEU')
+            jobs = await scraper.scrape_jobs_async(session, slug, keywords=keywords, location='DEU')
         else:
             # Auto-discover API on first run
             print(f"🔍 No saved API config found. Discovering API...")
-            discovered_config = await discover_company_api(url)
+            discovered_config = await discover_company_api(url, await get_browser())
             
             if discovered_config:
                 print(f"✅ Successfully discovered API!")
@@ -85,11 +71,16 @@ async def scrape_company_async(company, scraper):
                 print(f"💾 Saved configuration for future use")
                 
                 # Try to scrape with discovered config
-                jobs = scraper.scrape_jobs(slug, keywords=keywords, location='DEU')
+                jobs = await scraper.scrape_jobs_async(session, slug, keywords=keywords, location='DEU')
             else:
                 print(f"⚠️  Could not discover API. Falling back to HTML scraping...")
                 use_api = False
     
+    def save_found_api(config):
+        config['company_name'] = name
+        scraper.save_config(slug, config)
+        print(f"💾 Saved intercepted job API for future runs")
+    
     # Fallback to HTML scraping if API didn't work
     if not use_api or not jobs:
         if not use_api:
@@ -99,7 +90,10 @@ async def scrape_company_async(company, scraper):
         
         # Use async HTML scraper (we'll create this)
         try:
-            html_jobs = await scrape_html_async(name, url, keywords, locations)
+            html_jobs = await scrape_html_async(
+                name, url, keywords, locations,
+                on_api_found=save_found_api if company.use_api else None
+            )
             jobs.extend(html_jobs)
         except Exception as e:
             print(f"❌ HTML scraping also failed: {str(e)}")
@@ -122,18 +116,36 @@ async def scrape_all_companies_async():
     all_jobs = []
     
     # Use new COMPANIES config if available
-    companies_to_scrape = COMPANIES if COMPANIES else COMPANY_URLS
+    companies_to_scrape = COMPANIES if COMPANIES else tuple(CompanyConfig(**c) for c in COMPANY_URLS)
     
     if not companies_to_scrape:
         print("⚠️  No companies configured!")
         return []
     
-    for company in companies_to_scrape:
-        jobs = await scrape_company_async(company, scraper)
-        all_jobs.extend(jobs)
-        
-        # Be polite - wait between companies
-        await asyncio.sleep(2)
+    # Each company is a separate host, so scrape them concurrently.
+    # The semaphore bounds how many browsers/API calls run at once.
+    # API companies only use the HTTP session; Chromium is launched lazily
+    # the first time a company needs discovery or HTML scraping.
+    sem = asyncio.Semaphore(MAX_CONCURRENT_COMPANIES)
+    session = create_api_session()
+    
+    async def scrape_with_limit(company):
+        async with sem:
+            return await scrape_company_async(company, scraper, session)
+    
+    tasks = [scrape_with_limit(company) for company in companies_to_scrape]
+    try:
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+    finally:
+        await session.close()
+        scraper.close()
+        await close_browser()
+    
+    for company, result in zip(companies_to_scrape, results):
+        if isinstance(result, Exception):
+            print(f"❌ Error scraping {company.name}: {str(result)}")
+            continue
+        all_jobs.extend(result)
     
     return all_jobs
 
@@ -183,6 +195,7 @@ def main():
     # Step 3: Send email notification
     print("\n📧 Step 3: Sending email notification...")
     email_success = send_email(new_jobs)
+    close_smtp()
     
     if email_success:
         print("\n" + "=" * 60)
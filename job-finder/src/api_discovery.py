@@ -11,11 +11,110 @@ This module automatically discovers job board APIs by:
 
 import asyncio
 import json
+import orjson
 import re
+from collections import deque
 from datetime import datetime
 from typing import Dict, List, Optional, Any
-from playwright.async_api import async_playwright, Request, Response
-from urllib.parse import urlparse
+from playwright.async_api import async_playwright, Browser, Request, Response
+from urllib.parse import urlparse, parse_qs
+
+
+# Key fragments that suggest a response contains job listings
+JOB_FIELDS = ('title', 'location', 'position', 'description', 'salary')
+JOB_ITEM_FIELDS = ('title', 'job', 'position')
+
+# Score at which a request is treated as the job API without scoring the rest
+DOMINANT_SCORE = 60
+
+# Headers that indicate API authentication, and the wider set kept in configs
+AUTH_HEADERS = frozenset(['api-key', 'x-api-key', 'authorization', 'apikey'])
+IMPORTANT_HEADER_PATTERNS = ('api-key', 'x-api-key', 'authorization', 'content-type', 'apikey')
+
+# Limits on what _on_request keeps in memory
+MAX_CAPTURED = 256
+MAX_POST_DATA = 4096  # characters kept for non job-like POST bodies
+
+
+def _count_matching_keys(obj: Any, fields: tuple, cap: Optional[int] = None) -> int:
+    """
+    Count how many of `fields` appear in any dict key inside a JSON value.
+    
+    Walks the parsed structure breadth-first and only looks at keys, so large
+    response bodies are never serialized back to a string. Stops as soon as
+    `cap` fields (default: all of them) have been found.
+    """
+    if cap is None:
+        cap = len(fields)
+    
+    found = set()
+    queue = deque([obj])
+    while queue:
+        node = queue.popleft()
+        if isinstance(node, dict):
+            for key, value in node.items():
+                key_lower = str(key).lower()
+                for field in fields:
+                    if field in key_lower:
+                        found.add(field)
+                if len(found) >= cap:
+                    return len(found)
+                if isinstance(value, (dict, list)):
+                    queue.append(value)
+        elif isinstance(node, list):
+            queue.extend(item for item in node if isinstance(item, (dict, list)))
+    
+    return len(found)
+
+
+# Runs in the page: type into the first search box found, press Enter, then
+# click the first button matching each text. Returns True if anything fired.
+TRIGGER_API_CALLS_JS = """
+({searchSelectors, buttonTexts, query}) => {
+    let triggered = false;
+    for (const selector of searchSelectors) {
+        const input = document.querySelector(selector);
+        if (!input) continue;
+        input.focus();
+        // Native setter so React/Vue controlled inputs pick up the value
+        const setValue = Object.getOwnPropertyDescriptor(HTMLInputElement.prototype, 'value').set;
+        setValue.call(input, query);
+        input.dispatchEvent(new Event('input', {bubbles: true}));
+        input.dispatchEvent(new Event('change', {bubbles: true}));
+        // Synthetic Enter key events never submit a form; submit it directly
+        if (input.form) {
+            if (input.form.requestSubmit) {
+                input.form.requestSubmit();
+            } else {
+                input.form.submit();
+            }
+        } else {
+            input.dispatchEvent(new KeyboardEvent('keydown', {key: 'Enter', code: 'Enter', keyCode: 13, bubbles: true}));
+        }
+        triggered = true;
+        break;
+    }
+    const buttons = Array.from(document.querySelectorAll('button'));
+    for (const text of buttonTexts) {
+        const button = buttons.find(b => (b.textContent || '').toLowerCase().includes(text.toLowerCase()));
+        if (button) {
+            button.click();
+            triggered = true;
+        }
+    }
+    return triggered;
+}
+"""
+
+
+def _important_headers(headers: Dict[str, str]) -> Dict[str, str]:
+    """Keep only authentication and content-type headers."""
+    important = {}
+    for key, value in headers.items():
+        key_lower = key.lower()
+        if any(pattern in key_lower for pattern in IMPORTANT_HEADER_PATTERNS):
+            important[key] = value
+    return important
 
 
 class APIDiscovery:
@@ -23,88 +122,172 @@ class APIDiscovery:
     
     def __init__(self):
         self.captured_requests: List[Dict] = []
+        # Captured requests by URL, in capture order, for O(1) response matching
+        self._by_url: Dict[str, List[Dict]] = {}
+        # Latest capture per (method, path, query keys), to drop re-fired requests
+        self._by_dedup_key: Dict[tuple, Dict] = {}
         self.job_api_keywords = [
             'job', 'career', 'position', 'vacancy', 'search', 'opening',
             'employment', 'recruit', 'applicant', 'candidate'
         ]
+        # One regex pass over a URL finds every keyword it contains
+        self._job_keyword_re = re.compile('|'.join(re.escape(k) for k in self.job_api_keywords))
+        # Set once a job-like JSON response arrives, so discovery can stop waiting
+        self._strong_candidate_found = asyncio.Event()
     
-    async def discover_api(self, career_url: str, timeout: int = 90000) -> Optional[Dict]:
+    async def discover_api(
+        self,
+        career_url: str,
+        timeout: int = 90000,
+        browser: Optional[Browser] = None
+    ) -> Optional[Dict]:
         """
         Discover job API from a career page URL.
         
         Args:
             career_url: The career page URL to analyze
             timeout: Maximum time to wait for page load (ms) - default 90 seconds
+            browser: Shared browser to open a context in. If None, a
+                browser is launched just for this call.
             
         Returns:
             Dictionary with API configuration or None if not found
         """
         print(f"🔍 Discovering API for: {career_url}")
         
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
-            context = await browser.new_context(
-                user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
-                ignore_https_errors=True  # Fix SSL certificate issues (e.g., Infineon)
-            )
+        if browser is None:
+            async with async_playwright() as p:
+                browser = await p.chromium.launch(headless=True)
+                try:
+                    return await self._discover_in_browser(browser, career_url, timeout)
+                finally:
+                    await browser.close()
+        
+        return await self._discover_in_browser(browser, career_url, timeout)
+    
+    async def _discover_in_browser(
+        self,
+        browser: Browser,
+        career_url: str,
+        timeout: int
+    ) -> Optional[Dict]:
+        """Run discovery in a fresh context of an already running browser."""
+        context = await browser.new_context(
+            user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
+            ignore_https_errors=True  # Fix SSL certificate issues (e.g., Infineon)
+        )
+        
+        try:
             page = await context.new_page()
             
             # Set up request/response interceptors
             page.on("request", self._on_request)
             page.on("response", self._on_response)
             
+            print(f"📄 Loading career page...")
+            # Use longer timeout and wait for network to be idle
+            await page.goto(career_url, timeout=timeout, wait_until='networkidle')
+            
+            # Try to interact with the page to trigger API calls
+            await self._trigger_api_calls(page)
+            
+            # Wait for a job-like JSON response, up to 5 seconds
+            print(f"⏳ Waiting for dynamic content...")
             try:
-                print(f"📄 Loading career page...")
-                # Use longer timeout and wait for network to be idle
-                await page.goto(career_url, timeout=timeout, wait_until='networkidle')
-                
-                # Wait additional time for lazy-loaded content
-                print(f"⏳ Waiting for dynamic content...")
-                await page.wait_for_timeout(5000)
-                
-                # Try to interact with the page to trigger API calls
-                await self._trigger_api_calls(page)
-                
-                # Analyze captured requests
-                api_config = self._analyze_requests(career_url)
-                
-                await browser.close()
-                
-                if api_config:
-                    print(f"✅ Successfully discovered API!")
-                    return api_config
-                else:
-                    print(f"❌ No job API found")
-                    return None
-                    
-            except Exception as e:
-                print(f"❌ Error during discovery: {str(e)}")
-                await browser.close()
+                await asyncio.wait_for(self._strong_candidate_found.wait(), timeout=5)
+            except asyncio.TimeoutError:
+                pass
+            
+            # Analyze captured requests
+            api_config = self._analyze_requests(career_url)
+            
+            if api_config:
+                print(f"✅ Successfully discovered API!")
+                return api_config
+            else:
+                print(f"❌ No job API found")
                 return None
+                
+        except Exception as e:
+            print(f"❌ Error during discovery: {str(e)}")
+            return None
+        finally:
+            await context.close()
     
     def _on_request(self, request: Request):
-        """Capture all requests."""
+        """Capture XHR/Fetch requests that could plausibly be a job API."""
         # Only capture XHR and Fetch requests
         resource_type = request.resource_type
         if resource_type in ['xhr', 'fetch']:
             try:
+                url_lower = request.url.lower()
+                method = request.method
+                keyword_hits = self._count_url_keywords(url_lower)
+                
+                # Plain GETs with no job keyword and no API key are almost always
+                # assets/analytics; authenticated GETs are kept since the auth
+                # header (and the response body) can still make them the best match
+                if not keyword_hits and method != 'POST' and not (AUTH_HEADERS & request.headers.keys()):
+                    return
+                
+                # Pagination/polling re-fires the same call - keep one copy,
+                # preferring one that already has a response body
+                parsed = urlparse(request.url)
+                dedup_key = (method, parsed.path, frozenset(parse_qs(parsed.query, keep_blank_values=True).keys()))
+                existing = self._by_dedup_key.get(dedup_key)
+                if existing is not None and 'response_body' in existing:
+                    return
+                
                 # Try to get post_data, but handle binary data gracefully
                 post_data = None
-                try:
-                    post_data = request.post_data
-                except UnicodeDecodeError:
-                    # Skip binary data that can't be decoded as UTF-8
-                    pass
+                if method == 'POST':
+                    try:
+                        post_data = request.post_data
+                    except UnicodeDecodeError:
+                        # Skip binary data that can't be decoded as UTF-8
+                        pass
+                
+                # Keep full bodies for job-like URLs (they become the payload
+                # template); other POSTs (analytics beacons etc.) get truncated
+                if post_data and not keyword_hits:
+                    post_data = post_data[:MAX_POST_DATA]
+                
+                # Only keep the headers we score on or save into the config
+                headers = _important_headers(request.headers)
+                
+                preliminary_score = 10 * keyword_hits + (5 if method == 'POST' else 0)
+                preliminary_score += 15 * len(AUTH_HEADERS & headers.keys())
                 
                 request_data = {
                     'url': request.url,
-                    'method': request.method,
-                    'headers': request.headers,
+                    'method': method,
+                    'headers': headers,
                     'post_data': post_data,
-                    'resource_type': resource_type,
+                    'keyword_hits': keyword_hits,
+                    'preliminary_score': preliminary_score,
+                    'dedup_key': dedup_key,
                     'timestamp': datetime.utcnow().isoformat()
                 }
-                self.captured_requests.append(request_data)
+                
+                if existing is not None:
+                    # Overwrite the older copy in place so its list position is kept
+                    self._forget(existing)
+                    existing.clear()
+                    existing.update(request_data)
+                    request_data = existing
+                else:
+                    self.captured_requests.append(request_data)
+                
+                self._by_url.setdefault(request_data['url'], []).append(request_data)
+                self._by_dedup_key[dedup_key] = request_data
+                
+                # Evict the weakest (oldest on ties) candidate when over the cap
+                if len(self.captured_requests) > MAX_CAPTURED:
+                    weakest = min(
+                        range(len(self.captured_requests)),
+                        key=lambda i: self.captured_requests[i]['preliminary_score']
+                    )
+                    self._forget(self.captured_requests.pop(weakest))
             except Exception as e:
                 # Silently skip problematic requests
                 pass
@@ -114,62 +297,80 @@ class APIDiscovery:
         try:
             # Only process JSON responses
             content_type = response.headers.get('content-type', '')
-            if 'application/json' in content_type:
-                url = response.url
+            if 'application/json' not in content_type:
+                return
+            
+            url = response.url
+            is_job_url = self._job_keyword_re.search(url.lower()) is not None
+            
+            # Find the matching request
+            req = next(
+                (r for r in self._by_url.get(url, ()) if 'response_body' not in r),
+                None
+            )
+            if req is None:
+                return
+            
+            # Skip bodies that cannot be a job API (tracking beacons,
+            # SDK manifests...) unless it is a JSON POST search
+            if not is_job_url and not self._is_json_post(req):
+                return
+            try:
+                body = await response.json()
+                req['response_body'] = body
+                req['status_code'] = response.status
                 
-                # Find the matching request
-                for req in self.captured_requests:
-                    if req['url'] == url and 'response_body' not in req:
-                        try:
-                            body = await response.json()
-                            req['response_body'] = body
-                            req['status_code'] = response.status
-                        except:
-                            pass
-                        break
+                if is_job_url:
+                    self._strong_candidate_found.set()
+            except:
+                pass
         except:
             pass
     
+    def _forget(self, request_data: Dict):
+        """Remove an evicted or replaced request from the lookup indexes."""
+        same_url = self._by_url.get(request_data['url'])
+        if same_url:
+            same_url[:] = [r for r in same_url if r is not request_data]
+            if not same_url:
+                del self._by_url[request_data['url']]
+        if self._by_dedup_key.get(request_data['dedup_key']) is request_data:
+            del self._by_dedup_key[request_data['dedup_key']]
+    
+    @staticmethod
+    def _is_json_post(request: Dict) -> bool:
+        """Check if a captured request is a POST with a JSON body."""
+        if request['method'] != 'POST':
+            return False
+        content_type = next(
+            (value for key, value in request['headers'].items() if key.lower() == 'content-type'),
+            ''
+        )
+        return 'json' in content_type.lower()
+    
     async def _trigger_api_calls(self, page):
         """Try to trigger API calls by interacting with the page."""
         try:
-            # Look for search boxes and trigger them
-            search_selectors = [
-                'input[type="search"]',
-                'input[placeholder*="search" i]',
-                'input[placeholder*="job" i]',
-                'input[id*="search" i]',
-                'input[class*="search" i]'
-            ]
+            # Fill the first search box and click filter buttons in a single
+            # page.evaluate round-trip instead of one query per selector
+            triggered = await page.evaluate(TRIGGER_API_CALLS_JS, {
+                'searchSelectors': [
+                    'input[type="search"]',
+                    'input[placeholder*="search" i]',
+                    'input[placeholder*="job" i]',
+                    'input[id*="search" i]',
+                    'input[class*="search" i]'
+                ],
+                'buttonTexts': ['Search', 'Filter', 'Apply'],
+                'query': 'intern'
+            })
             
-            for selector in search_selectors:
+            # Give triggered requests a moment to finish
+            if triggered:
                 try:
-                    element = await page.query_selector(selector)
-                    if element:
-                        await element.fill('intern')
-                        await page.wait_for_timeout(1000)
-                        # Try to submit/trigger search
-                        await element.press('Enter')
-                        await page.wait_for_timeout(2000)
-                        break
-                except:
-                    continue
-            
-            # Try clicking common filter buttons
-            filter_selectors = [
-                'button:has-text("Search")',
-                'button:has-text("Filter")',
-                'button:has-text("Apply")'
-            ]
-            
-            for selector in filter_selectors:
-                try:
-                    element = await page.query_selector(selector)
-                    if element:
-                        await element.click()
-                        await page.wait_for_timeout(2000)
-                except:
-                    continue
+                    await page.wait_for_load_state('networkidle', timeout=2000)
+                except Exception:
+                    pass
                     
         except Exception as e:
             print(f"⚠️  Could not trigger additional API calls: {str(e)}")
@@ -182,36 +383,55 @@ class APIDiscovery:
         """
         print(f"📊 Analyzing {len(self.captured_requests)} captured requests...")
         
-        candidates = []
+        best = None
+        best_score = 0
+        num_candidates = 0
         
         for req in self.captured_requests:
-            score = self._score_request(req, career_url)
+            score = self._score_request(req, career_url, best_score)
             if score > 0:
-                candidates.append({
-                    'request': req,
-                    'score': score
-                })
+                num_candidates += 1
+            if score > best_score:
+                best = req
+                best_score = score
+                
+                # Clear winner (e.g. auth header + job URL + job-like body) - stop scoring
+                if best_score >= DOMINANT_SCORE:
+                    break
         
-        if not candidates:
+        if best is None:
             return None
         
-        # Sort by score and take the best one
-        candidates.sort(key=lambda x: x['score'], reverse=True)
-        best = candidates[0]
-        
-        print(f"🎯 Found {len(candidates)} potential APIs, best score: {best['score']}")
+        print(f"🎯 Found {num_candidates} potential APIs, best score: {best_score}")
         
-        return self._extract_config(best['request'], career_url)
+        return self._extract_config(best, career_url)
     
-    def _score_request(self, request: Dict, career_url: str) -> int:
-        """Score a request based on likelihood of being a job API."""
+    def _count_url_keywords(self, url_lower: str) -> int:
+        """Count how many distinct job keywords appear in a lowercased URL."""
+        return len(set(self._job_keyword_re.findall(url_lower)))
+    
+    def _score_request(self, request: Dict, career_url: str, best_score: int = 0) -> int:
+        """
+        Score a request based on likelihood of being a job API.
+        
+        The response-body key scan is skipped when it could not lift the
+        score above `best_score`; the returned score is then a lower bound.
+        """
         score = 0
-        url = request['url'].lower()
         
-        # Check URL for job-related keywords
-        for keyword in self.job_api_keywords:
-            if keyword in url:
-                score += 10
+        # Check URL for job-related keywords (counted once at capture time)
+        keyword_hits = request.get('keyword_hits')
+        if keyword_hits is None:
+            keyword_hits = self._count_url_keywords(request['url'].lower())
+        score += 10 * keyword_hits
+        
+        # Prefer POST requests (more likely to be search APIs)
+        if request['method'] == 'POST':
+            score += 5
+        
+        # Check for API authentication headers
+        headers = request['headers']
+        score += 15 * len(AUTH_HEADERS & headers.keys())
         
         # Prefer requests with response bodies
         if 'response_body' in request:
@@ -226,45 +446,23 @@ class APIDiscovery:
                     score += 15
                 
                 # Look for job-related fields
-                response_str = json.dumps(response).lower()
-                job_fields = ['title', 'location', 'position', 'description', 'salary']
-                for field in job_fields:
-                    if field in response_str:
-                        score += 5
+                if score + 5 * len(JOB_FIELDS) > best_score:
+                    score += 5 * _count_matching_keys(response, JOB_FIELDS)
             
             elif isinstance(response, list):
                 score += 10
                 # If it's an array, check first item
-                if len(response) > 0 and isinstance(response[0], dict):
-                    item_str = json.dumps(response[0]).lower()
-                    if any(field in item_str for field in ['title', 'job', 'position']):
+                if len(response) > 0 and isinstance(response[0], dict) and score + 10 > best_score:
+                    if _count_matching_keys(response[0], JOB_ITEM_FIELDS, cap=1):
                         score += 10
         
-        # Prefer POST requests (more likely to be search APIs)
-        if request['method'] == 'POST':
-            score += 5
-        
-        # Check for API authentication headers
-        headers = request['headers']
-        auth_headers = ['api-key', 'x-api-key', 'authorization', 'apikey']
-        for header in auth_headers:
-            if header in headers:
-                score += 15
-        
         return score
     
     def _extract_config(self, request: Dict, career_url: str) -> Dict:
         """Extract API configuration from a request."""
-        headers = request['headers']
-        
-        # Extract important headers (authentication, content-type, referer)
-        important_headers = {}
-        header_patterns = ['api-key', 'x-api-key', 'authorization', 'content-type', 'apikey']
-        
-        for key, value in headers.items():
-            key_lower = key.lower()
-            if any(pattern in key_lower for pattern in header_patterns):
-                important_headers[key] = value
+        # Headers were already cut down to the important ones at capture time;
+        # copy them so adding the referer doesn't touch the captured request
+        important_headers = dict(request['headers'])
         
         # Always include referer
         important_headers['referer'] = career_url
@@ -273,7 +471,7 @@ class APIDiscovery:
         payload_template = None
         if request['method'] == 'POST' and request.get('post_data'):
             try:
-                payload_template = json.loads(request['post_data'])
+                payload_template = orjson.loads(request['post_data'])
             except:
                 payload_template = request['post_data']
         
@@ -295,18 +493,19 @@ class APIDiscovery:
         return config
 
 
-async def discover_company_api(url: str) -> Optional[Dict]:
+async def discover_company_api(url: str, browser: Optional[Browser] = None) -> Optional[Dict]:
     """
     Convenience function to discover API for a company career page.
     
     Args:
         url: Career page URL
+        browser: Shared browser. If None, a browser is launched for this call.
         
     Returns:
         API configuration dictionary or None
     """
     discovery = APIDiscovery()
-    return await discovery.discover_api(url)
+    return await discovery.discover_api(url, browser=browser)
 
 
 if __name__ == "__main__":
@@ -2,20 +2,42 @@
 API-based web scraper that directly calls job board APIs instead of parsing HTML.
 This is more reliable and avoids bot detection.
 """
-import requests
-import time
+import aiohttp
 from typing import List, Dict, Optional
 from src.config import (
     JOB_TYPE_KEYWORDS,
     LOCATION_KEYWORDS
 )
+from src.utils import keyword_pattern
 
+_JOB_TYPE_RE = keyword_pattern(JOB_TYPE_KEYWORDS)
+_LOCATION_RE = keyword_pattern(LOCATION_KEYWORDS)
 
-def scrape_mediamarkt_saturn_api(keywords: List[str] = None, country: str = "DEU") -> List[Dict]:
+
+def create_api_session() -> aiohttp.ClientSession:
+    """
+    Create the shared HTTP session (keep-alive, pooled per host).
+    
+    aiohttp asks for gzip/deflate/br and decompresses responses itself;
+    br needs the Brotli package from requirements.txt.
+    """
+    return aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(
+            limit=20, limit_per_host=8, keepalive_timeout=60, ttl_dns_cache=300
+        )
+    )
+
+
+async def scrape_mediamarkt_saturn_api(
+    session: aiohttp.ClientSession,
+    keywords: List[str] = None,
+    country: str = "DEU"
+) -> List[Dict]:
     """
     Scrape jobs directly from Media MarktSaturn's Azure Search API.
     
     Args:
+        session: Shared aiohttp session
         keywords: List of keywords to search for
         country: Country code (default: DEU for Germany)
         
@@ -66,18 +88,18 @@ def scrape_mediamarkt_saturn_api(keywords: List[str] = None, country: str = "DEU
     
     try:
         print(f"Calling MediaMarktSaturn API...")
-        response = requests.post(
+        async with session.post(
             f"{api_url}?api-version=2020-06-30",
             json=payload,
             headers=headers,
-            timeout=30
-        )
-        
-        if response.status_code != 200:
-            print(f"API returned status code: {response.status_code}")
-            return []
+            timeout=aiohttp.ClientTimeout(total=30)
+        ) as response:
+            if response.status != 200:
+                print(f"API returned status code: {response.status}")
+                return []
+            
+            data = await response.json(content_type=None)
         
-        data = response.json()
         total_count = data.get("@odata.count", 0)
         jobs_data = data.get("value", [])
         
@@ -122,12 +144,7 @@ def is_valid_job_type(job_title: str) -> bool:
     if not job_title:
         return False
     
-    title_lower = job_title.lower()
-    for keyword in JOB_TYPE_KEYWORDS:
-        if keyword.lower() in title_lower:
-            return True
-    
-    return False
+    return _JOB_TYPE_RE.search(job_title) is not None
 
 
 def is_valid_location(location: str) -> bool:
@@ -135,59 +152,55 @@ def is_valid_location(location: str) -> bool:
     if not location:
         return False
     
-    location_lower = location.lower()
-    for keyword in LOCATION_KEYWORDS:
-        if keyword.lower() in location_lower:
-            return True
-    
-    return False
+    return _LOCATION_RE.search(location) is not None
 
 
-def scrape_all_companies_api(company_configs: List[Dict]) -> List[Dict]:
+async def scrape_all_companies_api(
+    company_configs: List[Dict],
+    session: Optional[aiohttp.ClientSession] = None
+) -> List[Dict]:
     """
     Scrape jobs from all configured companies using their APIs.
     
     Args:
         company_configs: List of company configuration dictionaries
+        session: Shared aiohttp session. If None, one is created for this call.
         
     Returns:
         List of all jobs from all companies
     """
     all_jobs = []
+    own_session = session is None
+    if own_session:
+        session = create_api_session()
     
-    for company in company_configs:
-        company_name = company.get("name")
-        
-        if not company_name:
-            continue
-        
-        # Check which company and call appropriate API
-        if "mediamarkt" in company_name.lower() or "saturn" in company_name.lower():
-            # Get keywords from config if specified
-            keywords = company.get("keywords", ["intern", "internship", "werkstudent", "praktikum"])
-            country = company.get("country", "DEU")
+    try:
+        for company in company_configs:
+            company_name = company.get("name")
             
-            jobs = scrape_mediamarkt_saturn_api(keywords=keywords, country=country)
+            if not company_name:
+                continue
             
-            # Filter by job type and location
-            filtered_jobs = []
-            for job in jobs:
-                # Check job type
-                if not is_valid_job_type(job['title']):
-                    continue
+            # Check which company and call appropriate API
+            if "mediamarkt" in company_name.lower() or "saturn" in company_name.lower():
+                # Get keywords from config if specified
+                keywords = company.get("keywords", ["intern", "internship", "werkstudent", "praktikum"])
+                country = company.get("country", "DEU")
                 
-                # Check location
-                if not is_valid_location(job['location']):
-                    continue
+                jobs = await scrape_mediamarkt_saturn_api(session, keywords=keywords, country=country)
                 
-                filtered_jobs.append(job)
-            
-            print(f"After filtering: {len(filtered_jobs)} jobs match criteria")
-            all_jobs.extend(filtered_jobs)
-        else:
-            print(f"No API implementation for {company_name} yet")
-        
-        # Be polite - wait between companies
-        time.sleep(1)
+                # Filter by job type and location
+                filtered_jobs = [
+                    job for job in jobs
+                    if is_valid_job_type(job['title']) and is_valid_location(job['location'])
+                ]
+                
+                print(f"After filtering: {len(filtered_jobs)} jobs match criteria")
+                all_jobs.extend(filtered_jobs)
+            else:
+                print(f"No API implementation for {company_name} yet")
+    finally:
+        if own_session:
+            await session.close()
     
     return all_jobs
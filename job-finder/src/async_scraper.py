@@ -2,120 +2,313 @@
 Async HTML scraper for fallback when API discovery fails.
 This is compatible with the async main script.
 """
-from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 import asyncio
-from typing import List, Dict
-from bs4 import BeautifulSoup
-from urllib.parse import urlparse
-from src.config import PAGE_LOAD_TIMEOUT, HEADLESS_MODE
+import orjson
+import re
+from datetime import datetime
+from typing import Any, Callable, List, Dict, Optional, Tuple
+from urllib.parse import urljoin, urlparse
+from src.config import PAGE_LOAD_TIMEOUT, WAIT_FOR_CONTENT_TIMEOUT
+from src.browser_pool import borrow_context
+from src.utils import JOB_LIST_KEYS, JOB_TITLE_KEYS, JOB_URL_KEYS, keyword_pattern, parse_html_without_svg
+
+# Link paths that usually point at a job posting
+_JOB_HREF_RE = re.compile(r'job|career|position', re.IGNORECASE)
+
+# Keys that may hold a job's location in a background JSON job list, and the
+# keys tried inside it when the value is an object (e.g. {"name": "Munich"})
+_LOCATION_KEYS = ('location', 'locationName', 'city', 'locations', 'categories')
+_LOCATION_OBJECT_KEYS = ('city', 'name', 'location')
 
 
 async def scrape_html_async(
     company_name: str,
     url: str,
     keywords: List[str],
-    locations: List[str]
+    locations: List[str],
+    on_api_found: Optional[Callable[[Dict], None]] = None
 ) -> List[Dict]:
     """
     Async HTML scraper for when API discovery fails.
     
+    If the page loads its listings from a JSON endpoint while rendering,
+    those rows are returned directly and HTML parsing is skipped.
+    
     Args:
         company_name: Name of the company
         url: Career page URL
         keywords: Job type keywords to filter
         locations: Location keywords to filter
+        on_api_found: Called with an API config when a JSON job endpoint is seen,
+            so it can be saved for API-only scraping next time
         
     Returns:
         List of job dictionaries
     """
     jobs = []
+    captured = []
+    pending = []
     
     try:
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(
-                headless=HEADLESS_MODE,
-                args=['--disable-blink-features=AutomationControlled']
-            )
+        # Pooled contexts also bound open pages (RAM) when many companies run concurrently
+        async with borrow_context() as context:
+            page = await context.new_page()
+            
+            # Watch for the JSON request that populates the listings
+            page.on('response', lambda response: pending.append(
+                asyncio.ensure_future(_capture_json_jobs(response, captured))
+            ))
+            
+            print(f"📄 Loading page with HTML parser...")
+            await page.goto(url, timeout=PAGE_LOAD_TIMEOUT, wait_until='domcontentloaded')
+            
+            # Try to dismiss cookie banners
+            try:
+                cookie_button = page.locator(
+                    "button:has-text('Accept'), button:has-text('Agree')"
+                ).first
+                await cookie_button.wait_for(state='visible', timeout=1500)
+                await cookie_button.click(timeout=2000)
+            except:
+                pass
             
+            # Scroll to load lazy content
             try:
-                context = await browser.new_context(
-                    viewport={'width': 1920, 'height': 1080},
-                    user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
-                )
-                page = await context.new_page()
-                
-                # Hide webdriver property
-                await page.add_init_script("""
-                    Object.defineProperty(navigator, 'webdriver', {
-                        get: () => undefined
-                    });
-                """)
-                
-                print(f"📄 Loading page with HTML parser...")
-                await page.goto(url, timeout=PAGE_LOAD_TIMEOUT, wait_until='domcontentloaded')
-                
-                # Wait for content
-                await asyncio.sleep(5)
-                
-                # Try to dismiss cookie banners
-                try:
-                    cookie_buttons = [
-                        "button:has-text('Accept')",
-                        "button:has-text('Accept all')",
-                        "button:has-text('Agree')",
-                    ]
-                    for selector in cookie_buttons:
-                        try:
-                            count = await page.locator(selector).count()
-                            if count > 0:
-                                await page.locator(selector).first.click(timeout=2000)
-                                await asyncio.sleep(1)
-                                break
-                        except:
-                            continue
-                except:
-                    pass
-                
-                # Scroll to load lazy content
-                try:
-                    await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                    await asyncio.sleep(2)
-                except:
-                    pass
-                
-                # Get HTML content
-                html_content = await page.content()
-                print(f"📊 Retrieved {len(html_content)} characters of HTML")
-                
-                # Parse HTML
-                jobs = parse_jobs_from_html_async(
-                    html_content, company_name, url, keywords, locations
-                )
-                print(f"✅ Found {len(jobs)} jobs via HTML scraping")
-                
-            finally:
-                await browser.close()
-                
+                await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+                await _wait_for_network_idle(page)
+            except:
+                pass
+            
+            # Use the background JSON job list if the page loaded one
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+            if captured:
+                response, jobs_path, items = max(captured, key=lambda c: len(c[2]))
+                jobs = _jobs_from_json_items(items, company_name, url, keyword_pattern(keywords))
+                if jobs:
+                    print(f"✅ Found {len(jobs)} jobs via {response.url}")
+                    if on_api_found:
+                        on_api_found(_api_config_from_response(response, url, jobs_path, items))
+                    return jobs
+            
+            # Get HTML content
+            html_content = await page.content()
+            print(f"📊 Retrieved {len(html_content)} characters of HTML")
+            
+            # Parse HTML in a worker thread so other companies' pages keep running
+            jobs = await asyncio.to_thread(
+                parse_jobs_from_html_sync,
+                html_content, company_name, url, keywords, locations
+            )
+            print(f"✅ Found {len(jobs)} jobs via HTML scraping")
+            
     except Exception as e:
         print(f"❌ HTML scraping error: {str(e)}")
+    finally:
+        # Don't leave response captures running after an early error
+        for task in pending:
+            if not task.done():
+                task.cancel()
     
     return jobs
 
 
-def parse_jobs_from_html_async(
+async def _capture_json_jobs(response, captured: List):
+    """Keep a JSON response from a job-like URL if its body is a list of jobs."""
+    try:
+        if 'application/json' not in response.headers.get('content-type', ''):
+            return
+        if not _JOB_HREF_RE.search(response.url):
+            return
+        jobs_path, items = _find_job_list(await response.json())
+        if items:
+            captured.append((response, jobs_path, items))
+    except Exception:
+        pass
+
+
+def _find_job_list(body: Any) -> Tuple[Optional[str], Optional[List[Dict]]]:
+    """Return (key it sits under or None, list of job-like dicts) for a JSON body."""
+    jobs_path = None
+    if isinstance(body, dict):
+        for path in JOB_LIST_KEYS:
+            if isinstance(body.get(path), list):
+                jobs_path = path
+                body = body[path]
+                break
+    
+    if isinstance(body, list) and body and isinstance(body[0], dict):
+        if any(key in body[0] for key in JOB_TITLE_KEYS):
+            return jobs_path, body
+    return None, None
+
+
+def _first_value(item: Dict, keys: tuple) -> Any:
+    """Return the first present, non-empty value among keys."""
+    return next((item[key] for key in keys if item.get(key)), None)
+
+
+def _jobs_from_json_items(items: List[Dict], company_name: str, base_url: str, keyword_re) -> List[Dict]:
+    """Map JSON job rows into the standard job dict, keeping keyword matches."""
+    jobs = []
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        title = _first_value(item, JOB_TITLE_KEYS)
+        job_url = _first_value(item, JOB_URL_KEYS)
+        if not isinstance(title, str) or not isinstance(job_url, str):
+            continue
+        if not keyword_re.search(title):
+            continue
+        
+        location = _first_value(item, _LOCATION_KEYS)
+        if isinstance(location, list):
+            location = location[0] if location else None
+        if isinstance(location, dict):
+            location = _first_value(location, _LOCATION_OBJECT_KEYS)
+        
+        jobs.append({
+            "company": company_name,
+            "title": title,
+            "location": location if isinstance(location, str) else "Not specified",
+            "url": urljoin(base_url, job_url)
+        })
+    return jobs
+
+
+def _first_key(item: Dict, keys: tuple) -> Optional[str]:
+    """Return the first key among keys with a present, non-empty value."""
+    return next((key for key in keys if item.get(key)), None)
+
+
+def _location_path(item: Dict) -> Optional[List]:
+    """Path to a job's location string, mirroring how _jobs_from_json_items reads it."""
+    key = _first_key(item, _LOCATION_KEYS)
+    if key is None:
+        return None
+    path = [key]
+    value = item[key]
+    if isinstance(value, list):
+        path.append(0)
+        value = value[0]
+    if isinstance(value, dict):
+        subkey = _first_key(value, _LOCATION_OBJECT_KEYS)
+        if subkey is None:
+            return None
+        path.append(subkey)
+        value = value[subkey]
+    return path if isinstance(value, str) else None
+
+
+def _response_format(items: List[Dict], career_url: str, jobs_path: Optional[str]) -> Dict:
+    """
+    Describe where the fields live in an intercepted job list.
+    
+    DynamicAPIScraper reads saved configs through this response_format, so
+    the next run extracts the same title/url/location this run did.
+    """
+    response_format = {}
+    if jobs_path:
+        response_format['jobs_path'] = jobs_path
+    
+    # Use the first row that _jobs_from_json_items would accept
+    sample = next((
+        item for item in items
+        if isinstance(item, dict)
+        and isinstance(_first_value(item, JOB_TITLE_KEYS), str)
+        and isinstance(_first_value(item, JOB_URL_KEYS), str)
+    ), None)
+    if sample is None:
+        return response_format
+    
+    response_format['title_field'] = _first_key(sample, JOB_TITLE_KEYS)
+    url_field = _first_key(sample, JOB_URL_KEYS)
+    response_format['url_field'] = url_field
+    
+    location_fields = _location_path(sample)
+    if location_fields:
+        response_format['location_fields'] = location_fields
+    
+    # Relative links: save what urljoin would put in front of them
+    job_url = sample[url_field]
+    if not job_url.startswith('http'):
+        absolute = urljoin(career_url, job_url)
+        if absolute.endswith(job_url):
+            response_format['url_prefix'] = absolute[:len(absolute) - len(job_url)]
+        else:
+            parsed = urlparse(career_url)
+            response_format['url_prefix'] = f"{parsed.scheme}://{parsed.netloc}"
+    
+    return response_format
+
+
+def _api_config_from_response(
+    response,
+    career_url: str,
+    jobs_path: Optional[str],
+    items: List[Dict]
+) -> Dict:
+    """Build a DynamicAPIScraper config for an intercepted JSON job endpoint."""
+    request = response.request
+    payload_template = None
+    if request.method == 'POST' and request.post_data:
+        try:
+            payload_template = orjson.loads(request.post_data)
+        except Exception:
+            payload_template = request.post_data
+    
+    headers = {
+        key: value for key, value in request.headers.items()
+        if key.lower() == 'content-type'
+    }
+    headers['referer'] = career_url
+    
+    return {
+        'endpoint': response.url,
+        'method': request.method,
+        'headers': headers,
+        'payload_template': payload_template,
+        'response_format': _response_format(items, career_url, jobs_path),
+        'discovered_at': datetime.utcnow().isoformat() + 'Z',
+        'career_url': career_url
+    }
+
+
+async def _wait_for_network_idle(page):
+    """Wait until the page stops loading, capped at WAIT_FOR_CONTENT_TIMEOUT."""
+    try:
+        await page.wait_for_load_state('networkidle', timeout=WAIT_FOR_CONTENT_TIMEOUT)
+    except PlaywrightTimeoutError:
+        pass
+
+
+def parse_jobs_from_html_sync(
     html_content: str,
     company_name: str,
     base_url: str,
     keywords: List[str],
     locations: List[str]
 ) -> List[Dict]:
-    """Parse jobs from HTML content."""
+    """Parse jobs from HTML content (synchronous; run it off the event loop)."""
     jobs = []
-    soup = BeautifulSoup(html_content, 'html.parser')
+    soup = parse_html_without_svg(html_content)
+    
+    # One regex scan per string instead of a Python loop per keyword
+    keyword_re = keyword_pattern(keywords)
+    location_re = keyword_pattern(locations)
     
     # Find all links
     all_links = soup.find_all('a', href=True)
     
+    # Cards often hold several anchors (title + "apply"), so walk each parent once
+    parent_text_cache: Dict[int, str] = {}
+    
+    # base_url is fixed for the whole page, so resolve its parts once
+    base_parsed = urlparse(base_url)
+    base_origin = f"{base_parsed.scheme}://{base_parsed.netloc}"
+    base_trim = base_url.rstrip('/')
+    
     for link in all_links:
         href = link.get('href', '')
         text = link.get_text(strip=True)
@@ -124,39 +317,40 @@ def parse_jobs_from_html_async(
             continue
         
         # Check if this looks like a job posting
-        if ('job' in href.lower() or 'career' in href.lower() or 
-            'position' in href.lower() or len(text) > 20):
-            
-            title = text
-            location = "Not specified"
-            
-            # Look for location in parent elements
-            parent = link.parent
-            if parent:
+        if not (_JOB_HREF_RE.search(href) or len(text) > 20):
+            continue
+        
+        # Check if title matches keywords (cheap) before walking the parent
+        title = text
+        if not keyword_re.search(title):
+            continue
+        
+        location = "Not specified"
+        
+        # Look for location in parent elements
+        parent = link.parent
+        if parent:
+            parent_text = parent_text_cache.get(id(parent))
+            if parent_text is None:
                 parent_text = parent.get_text(strip=True)
-                for loc_keyword in locations:
-                    if loc_keyword.lower() in parent_text.lower():
-                        # Extract the relevant location part
-                        location = parent_text[:100]  # Limit length
-                        break
-            
-            # Build absolute URL
-            if href.startswith('http'):
-                job_url = href
-            elif href.startswith('/'):
-                parsed = urlparse(base_url)
-                job_url = f"{parsed.scheme}://{parsed.netloc}{href}"
-            else:
-                job_url = f"{base_url.rstrip('/')}/{href.lstrip('/')}"
-            
-            # Check if title matches keywords
-            title_lower = title.lower()
-            if any(keyword.lower() in title_lower for keyword in keywords):
-                jobs.append({
-                    "company": company_name,
-                    "title": title,
-                    "location": location,
-                    "url": job_url
-                })
+                parent_text_cache[id(parent)] = parent_text
+            if location_re.search(parent_text):
+                # Extract the relevant location part
+                location = parent_text[:100]  # Limit length
+        
+        # Build absolute URL
+        if href.startswith('http'):
+            job_url = href
+        elif href.startswith('/'):
+            job_url = f"{base_origin}{href}"
+        else:
+            job_url = f"{base_trim}/{href.lstrip('/')}"
+        
+        jobs.append({
+            "company": company_name,
+            "title": title,
+            "location": location,
+            "url": job_url
+        })
     
     return jobs
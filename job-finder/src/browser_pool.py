@@ -0,0 +1,166 @@
+"""
+Shared Playwright browser for the async scrapers.
+
+Launching Chromium takes 1-2 seconds, so a single browser is started once
+per run and every company gets its own lightweight context from it.
+Use get_browser() anywhere in the run and close_browser() once at the end.
+
+HTML scraping borrows contexts from a small pool (borrow_context()) instead
+of creating one per company; the pool size also caps how many pages are
+open at once.
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional, Set
+from playwright.async_api import async_playwright, Browser, BrowserContext, Playwright
+from src.config import HEADLESS_MODE, MAX_CONCURRENT_PAGES
+
+# Resources the HTML parser never reads; aborting them cuts most page weight.
+# Scripts and XHR/fetch stay allowed - listings and JSON capture need them.
+_BLOCKED_RESOURCE_TYPES = frozenset(['image', 'media', 'font', 'stylesheet'])
+
+# Hide the webdriver property from bot checks
+_HIDE_WEBDRIVER_JS = """
+    Object.defineProperty(navigator, 'webdriver', {
+        get: () => undefined
+    });
+"""
+
+
+async def block_heavy_resources(route):
+    """Abort images, media, fonts and stylesheets; let everything else through."""
+    if route.request.resource_type in _BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+class BrowserPool:
+    """Lazily launches one Chromium instance and shares it between callers."""
+
+    def __init__(self, max_contexts: int = MAX_CONCURRENT_PAGES):
+        self._pw: Optional[Playwright] = None
+        self._browser: Optional[Browser] = None
+        self._lock = asyncio.Lock()
+        self._max_contexts = max_contexts
+        self._idle: asyncio.Queue = asyncio.Queue()
+        self._contexts: Set[BrowserContext] = set()
+        self._creating = 0
+
+    async def start(self) -> Browser:
+        """Start Playwright and launch the browser (no-op if already running)."""
+        async with self._lock:
+            if self._browser is None:
+                self._pw = await async_playwright().start()
+                self._browser = await self._pw.chromium.launch(
+                    headless=HEADLESS_MODE,
+                    args=[
+                        '--disable-blink-features=AutomationControlled',
+                        '--blink-settings=imagesEnabled=false'
+                    ]
+                )
+        return self._browser
+
+    async def get_browser(self) -> Browser:
+        """Return the shared browser, launching it on first use."""
+        if self._browser is None:
+            return await self.start()
+        return self._browser
+
+    async def _new_context(self) -> BrowserContext:
+        """Create a context set up for HTML scraping."""
+        browser = await self.get_browser()
+        context = await browser.new_context(
+            viewport={'width': 1920, 'height': 1080},
+            user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
+        )
+        await context.route('**/*', block_heavy_resources)
+        await context.add_init_script(_HIDE_WEBDRIVER_JS)
+        return context
+
+    async def _acquire(self) -> BrowserContext:
+        """Take an idle context, creating one while under the pool size."""
+        if self._idle.empty() and len(self._contexts) + self._creating < self._max_contexts:
+            return await self._create()
+        context = await self._idle.get()
+        if context is None:
+            # A broken context was dropped; its slot is ours to refill
+            return await self._create()
+        return context
+
+    async def _create(self) -> BrowserContext:
+        """Create a context in a reserved pool slot."""
+        # Reserve the slot before awaiting so concurrent callers can't overshoot
+        self._creating += 1
+        try:
+            context = await self._new_context()
+        finally:
+            self._creating -= 1
+        self._contexts.add(context)
+        return context
+
+    async def _release(self, context: BrowserContext):
+        """Reset a borrowed context and put it back, or drop it if it broke."""
+        if context not in self._contexts:
+            return  # Pool was closed while it was borrowed
+        try:
+            for page in context.pages:
+                await page.close()
+            await context.clear_cookies()
+        except Exception:
+            # Browser went away or context crashed - free the slot
+            self._contexts.discard(context)
+            self._idle.put_nowait(None)
+            try:
+                await context.close()
+            except Exception:
+                pass
+            return
+        self._idle.put_nowait(context)
+
+    @asynccontextmanager
+    async def context(self) -> AsyncIterator[BrowserContext]:
+        """Borrow a pooled context for the duration of the block."""
+        context = await self._acquire()
+        try:
+            yield context
+        finally:
+            await self._release(context)
+
+    async def close(self):
+        """Close the browser and stop Playwright."""
+        async with self._lock:
+            self._contexts = set()
+            self._idle = asyncio.Queue()
+            if self._browser is not None:
+                try:
+                    await self._browser.close()
+                except Exception:
+                    pass
+                self._browser = None
+            if self._pw is not None:
+                await self._pw.stop()
+                self._pw = None
+
+
+_shared_pool = BrowserPool()
+
+
+async def get_browser() -> Browser:
+    """Return the process-wide browser, launching it on first use."""
+    return await _shared_pool.get_browser()
+
+
+def borrow_context():
+    """
+    Borrow a context from the process-wide pool.
+
+    Usage: ``async with borrow_context() as context: ...``. Waits when all
+    contexts are in use; cookies are cleared before the next borrower.
+    """
+    return _shared_pool.context()
+
+
+async def close_browser():
+    """Shut down the process-wide browser (safe to call if never launched)."""
+    await _shared_pool.close()
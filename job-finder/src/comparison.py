@@ -3,8 +3,23 @@ Job comparison module to identify new job postings.
 """
 import json
 import os
-from typing import List, Dict
+import orjson
+from typing import List, Dict, Tuple
 from datetime import datetime
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+
+def normalize_url(url: str) -> str:
+    """
+    Normalize a job URL so trivially different spellings compare equal.
+    
+    Lowercases scheme and host, drops a trailing slash and the fragment, and
+    sorts query parameters. The query itself is kept since many boards put
+    the job id there (e.g. ?jobId=123).
+    """
+    parts = urlsplit(url.strip())
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip('/'), query, ''))
 
 
 def load_job_history(filepath: str) -> List[Dict]:
@@ -22,8 +37,8 @@ def load_job_history(filepath: str) -> List[Dict]:
         return []
     
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        with open(filepath, 'rb') as f:
+            data = orjson.loads(f.read())
             return data
     except json.JSONDecodeError:
         print(f"Error reading JSON from {filepath}. Starting with empty history.")
@@ -45,43 +60,102 @@ def save_job_history(jobs: List[Dict], filepath: str) -> None:
     os.makedirs(os.path.dirname(filepath), exist_ok=True)
     
     # Add timestamp to each job
+    now = datetime.now().isoformat()
     for job in jobs:
-        if "date_found" not in job:
-            job["date_found"] = datetime.now().isoformat()
+        job.setdefault("date_found", now)
     
     try:
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(jobs, f, indent=2, ensure_ascii=False)
+        # orjson output is byte-identical to json.dump(indent=2, ensure_ascii=False)
+        with open(filepath, 'wb') as f:
+            f.write(orjson.dumps(jobs, option=orjson.OPT_INDENT_2))
         print(f"Saved {len(jobs)} jobs to history file")
     except Exception as e:
         print(f"Error saving job history: {str(e)}")
 
 
-def find_new_jobs(current_jobs: List[Dict], historical_jobs: List[Dict]) -> List[Dict]:
+def _match_jobs(
+    current_jobs: List[Dict],
+    historical_jobs: List[Dict]
+) -> Tuple[List[Dict], List[Dict], List[Tuple[Dict, Dict]]]:
     """
-    Compare current jobs against historical jobs to find new ones.
+    Match current jobs against history by normalized URL in a single pass.
     
-    Jobs are considered the same if they have the same URL.
+    Pure: nothing is logged and no job dict is modified.
     
     Args:
         current_jobs: List of jobs from current scraping
         historical_jobs: List of jobs from previous runs
         
     Returns:
-        List of new jobs not found in history
+        Tuple of (new jobs, merged list of all unique jobs,
+        (current job, entry it replaces) pairs for jobs seen before)
     """
-    # Create a set of historical job URLs for fast lookup
-    historical_urls = {job.get("url") for job in historical_jobs if job.get("url")}
+    # Historical jobs first, keyed by normalized URL to avoid duplicates
+    merged = {}
+    for job in historical_jobs:
+        url = job.get("url")
+        if url:
+            merged[normalize_url(url)] = job
     
-    # Find jobs with URLs not in historical data
+    # Update with current jobs (this will update existing entries and add new ones)
     new_jobs = []
+    seen_before = []
     for job in current_jobs:
-        job_url = job.get("url")
-        if job_url and job_url not in historical_urls:
+        url = job.get("url")
+        if not url:
+            continue
+        key = normalize_url(url)
+        previous = merged.get(key)
+        if previous is None:
             new_jobs.append(job)
+        else:
+            seen_before.append((job, previous))
+        merged[key] = job
+    
+    return new_jobs, list(merged.values()), seen_before
+
+
+def compare_and_update(current_jobs: List[Dict], historical_jobs: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Find new jobs and build the merged history in a single pass.
+    
+    Jobs are considered the same if they have the same (normalized) URL.
+    New jobs are stamped with date_found; current jobs replace their
+    historical entry but keep its date_found.
+    
+    Args:
+        current_jobs: List of jobs from current scraping
+        historical_jobs: List of jobs from previous runs
+        
+    Returns:
+        Tuple of (new jobs not found in history, merged list of all unique jobs)
+    """
+    new_jobs, merged_jobs, seen_before = _match_jobs(current_jobs, historical_jobs)
+    
+    # New jobs first, so a URL repeated within this run copies their stamp
+    now = datetime.now().isoformat()
+    for job in new_jobs:
+        job["date_found"] = now
+    for job, previous in seen_before:
+        if "date_found" in previous:
+            job["date_found"] = previous["date_found"]
     
     print(f"Found {len(new_jobs)} new jobs out of {len(current_jobs)} total jobs")
-    return new_jobs
+    return new_jobs, merged_jobs
+
+
+def find_new_jobs(current_jobs: List[Dict], historical_jobs: List[Dict]) -> List[Dict]:
+    """
+    Compare current jobs against historical jobs to find new ones.
+    
+    Args:
+        current_jobs: List of jobs from current scraping
+        historical_jobs: List of jobs from previous runs
+        
+    Returns:
+        List of new jobs not found in history
+    """
+    return _match_jobs(current_jobs, historical_jobs)[0]
 
 
 def merge_jobs(current_jobs: List[Dict], historical_jobs: List[Dict]) -> List[Dict]:
@@ -95,25 +169,7 @@ def merge_jobs(current_jobs: List[Dict], historical_jobs: List[Dict]) -> List[Di
     Returns:
         Merged list of all unique jobs
     """
-    # Create a dictionary keyed by URL to avoid duplicates
-    all_jobs_dict = {}
-    
-    # Add historical jobs first
-    for job in historical_jobs:
-        url = job.get("url")
-        if url:
-            all_jobs_dict[url] = job
-    
-    # Update with current jobs (this will update existing entries and add new ones)
-    for job in current_jobs:
-        url = job.get("url")
-        if url:
-            if url not in all_jobs_dict:
-                # New job - add timestamp
-                job["date_found"] = datetime.now().isoformat()
-            all_jobs_dict[url] = job
-    
-    return list(all_jobs_dict.values())
+    return _match_jobs(current_jobs, historical_jobs)[1]
 
 
 def compare_and_update_jobs(current_jobs: List[Dict], history_filepath: str) -> List[Dict]:
@@ -130,11 +186,10 @@ def compare_and_update_jobs(current_jobs: List[Dict], history_filepath: str) ->
     # Load historical data
     historical_jobs = load_job_history(history_filepath)
     
-    # Find new jobs
-    new_jobs = find_new_jobs(current_jobs, historical_jobs)
+    # Find new jobs and merge with history in one pass
+    new_jobs, merged_jobs = compare_and_update(current_jobs, historical_jobs)
     
-    # Merge and save updated history
-    merged_jobs = merge_jobs(current_jobs, historical_jobs)
+    # Save updated history
     save_job_history(merged_jobs, history_filepath)
     
     return new_jobs
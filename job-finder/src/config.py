@@ -2,6 +2,25 @@
 Configuration settings for the job alert system.
 """
 import os
+from dataclasses import dataclass
+from typing import Optional, Tuple
+from src.utils import slugify
+
+
+@dataclass(frozen=True, slots=True)
+class CompanyConfig:
+    """A company to monitor. Immutable so it can be shared across coroutines."""
+    name: str
+    url: str
+    keywords: Tuple[str, ...] = ("intern", "internship")
+    locations: Tuple[str, ...] = ("Germany",)
+    slug: Optional[str] = None
+    use_api: bool = True
+    
+    def __post_init__(self):
+        if self.slug is None:
+            object.__setattr__(self, 'slug', slugify(self.name))
+
 
 # List of companies to monitor
 # Just add the career page URL - the system will automatically discover and learn the API!
@@ -14,110 +33,110 @@ import os
 # - locations: Location filters
 # - use_api: If True (default), tries to use discovered API. If False, uses HTML scraping.
 #
-COMPANIES = [
-    {
-        "name": "MediaMarkt Saturn",
-        "slug": "mediamarkt-saturn",  # This slug matches the config in api_configs.json
-        "url": "https://careers.mediamarktsaturn.com/",
-        "keywords": ["intern", "internship", "werkstudent", "working student"],
-        "locations": ["Germany", "DEU"],
-        "use_api": True,  # Use automatic API discovery
-    },
-    {
-        "name": "Robominds",
-        "url": "https://join.com/companies/robominds",
-        "keywords": ["intern", "internship", "werkstudent", "working student", "student"],
-        "locations": ["Germany", "Munich"],
-    },
+COMPANIES: Tuple[CompanyConfig, ...] = (
+    CompanyConfig(
+        name="MediaMarkt Saturn",
+        slug="mediamarkt-saturn",  # This slug matches the config in api_configs.json
+        url="https://careers.mediamarktsaturn.com/",
+        keywords=("intern", "internship", "werkstudent", "working student"),
+        locations=("Germany", "DEU"),
+        use_api=True,  # Use automatic API discovery
+    ),
+    CompanyConfig(
+        name="Robominds",
+        url="https://join.com/companies/robominds",
+        keywords=("intern", "internship", "werkstudent", "working student", "student"),
+        locations=("Germany", "Munich"),
+    ),
     
     # Only keeping reliably working companies for now
     # MediaMarkt Saturn works perfectly with API
     
     # Companies with intermittent issues (browser detection):
     # You can try adding these back, but they may fail sometimes
-    {
-        "name": "Celonis",
-        "url": "https://careers.celonis.com/join-us/open-positions?seniority=Working+Student+%26+Intern&groupedLocation=Munich%2C+Germany%7CRemote%2C+Germany",
-        "keywords": ["intern", "internship", "werkstudent", "working student", "student"],
-        "locations": ["Germany", "Munich", "Remote"],
-        "use_api": False,  # Disable API - HTML scraping works better for pre-filtered URLs
-    },
+    CompanyConfig(
+        name="Celonis",
+        url="https://careers.celonis.com/join-us/open-positions?seniority=Working+Student+%26+Intern&groupedLocation=Munich%2C+Germany%7CRemote%2C+Germany",
+        keywords=("intern", "internship", "werkstudent", "working student", "student"),
+        locations=("Germany", "Munich", "Remote"),
+        use_api=False,  # Disable API - HTML scraping works better for pre-filtered URLs
+    ),
 
-    {
-        "name": "AirBus",
-        "url": "https://ag.wd3.myworkdayjobs.com/en-US/Airbus?locationCountry=dcc5b7608d8644b3a93716604e78e995&workerSubType=f5811cef9cb50193723ed01d470a6e15",
-        "keywords": ["intern", "internship", "werkstudent", "working student", "student"],
-        "locations": ["Germany", "Munich", "Remote"],
-        "use_api": False,  # Disable API - HTML scraping works better for pre-filtered URLs
-    },
+    CompanyConfig(
+        name="AirBus",
+        url="https://ag.wd3.myworkdayjobs.com/en-US/Airbus?locationCountry=dcc5b7608d8644b3a93716604e78e995&workerSubType=f5811cef9cb50193723ed01d470a6e15",
+        keywords=("intern", "internship", "werkstudent", "working student", "student"),
+        locations=("Germany", "Munich", "Remote"),
+        use_api=False,  # Disable API - HTML scraping works better for pre-filtered URLs
+    ),
 
     # New companies added 2026-01-15
-    {
-        "name": "Infineon",
-        "url": "https://jobs.infineon.com/careers?domain=infineon.com&start=0&location=Germany&pid=563808968063175&sort_by=match&filter_include_remote=0",
-        "keywords": ["intern", "internship", "werkstudent", "working student", "student"],
-        "locations": ["Germany"],
-        "use_api": True,  # Try API discovery first
-    },
-    {
-        "name": "Siemens",
-        "slug": "siemens",  # API config already exists in api_configs.json
-        "url": "https://jobs.siemens.com/en_US/externaljobs?ste_sid=5f855cdd733bcdc8f16bf56668a0c81b",
-        "keywords": ["intern", "internship", "werkstudent", "working student", "student"],
-        "locations": ["Germany"],
-        "use_api": True,  # Will use existing API config
-    },
-    {
-        "name": "BSH Group",
-        "url": "https://jobs.bsh-group.de/index",
-        "keywords": ["intern", "internship", "werkstudent", "working student", "student"],
-        "locations": ["Germany"],
-        "use_api": True,  # Try API discovery first
-    },
-    {
-        "name": "Vinolinde",
-        "url": "https://join.com/companies/vinolinde",
-        "keywords": ["intern", "internship", "werkstudent", "working student", "student"],
-        "locations": ["Germany"],
-        "use_api": True,  # Try API discovery first
-    },
-    {
-        "name": "Stability AI",
-        "url": "https://stability.ai/careers",
-        "keywords": ["intern", "internship", "working student"],
-        "locations": ["Germany", "Remote"],
-        "use_api": True,  # Try API discovery first
-    },
-    {
-        "name": "Trusteq",
-        "url": "https://trusteq-gmbh.jobs.personio.de/?language=de",
-        "keywords": ["intern", "internship", "werkstudent", "working student", "student"],
-        "locations": ["Germany"],
-        "use_api": True,  # Try API discovery first
-    },
-    {
-        "name": "Capgemini",
-        "url": "https://www.capgemini.com/de-de/karriere/",
-        "keywords": ["intern", "internship", "werkstudent", "working student", "student", "praktikum"],
-        "locations": ["Germany"],
-        "use_api": False,  # Disable API - page timeout during discovery
-    },
-    {
-        "name": "Avelios",
-        "url": "https://www.avelios.com/careers",
-        "keywords": ["intern", "internship", "werkstudent", "working student", "student"],
-        "locations": ["Germany", "Munich", "Bavaria"],
-        "use_api": True,  # Try API discovery first
-    },
-    {
-        "name": "Valeo",
-        "url": "https://www.valeo.com/en/career-in-germany/",
-        "keywords": ["intern", "internship", "werkstudent", "working student", "student", "praktikant"],
-        "locations": ["Germany"],
-        "use_api": True,  # Try API discovery first
-    },
+    CompanyConfig(
+        name="Infineon",
+        url="https://jobs.infineon.com/careers?domain=infineon.com&start=0&location=Germany&pid=563808968063175&sort_by=match&filter_include_remote=0",
+        keywords=("intern", "internship", "werkstudent", "working student", "student"),
+        locations=("Germany",),
+        use_api=True,  # Try API discovery first
+    ),
+    CompanyConfig(
+        name="Siemens",
+        slug="siemens",  # API config already exists in api_configs.json
+        url="https://jobs.siemens.com/en_US/externaljobs?ste_sid=5f855cdd733bcdc8f16bf56668a0c81b",
+        keywords=("intern", "internship", "werkstudent", "working student", "student"),
+        locations=("Germany",),
+        use_api=True,  # Will use existing API config
+    ),
+    CompanyConfig(
+        name="BSH Group",
+        url="https://jobs.bsh-group.de/index",
+        keywords=("intern", "internship", "werkstudent", "working student", "student"),
+        locations=("Germany",),
+        use_api=True,  # Try API discovery first
+    ),
+    CompanyConfig(
+        name="Vinolinde",
+        url="https://join.com/companies/vinolinde",
+        keywords=("intern", "internship", "werkstudent", "working student", "student"),
+        locations=("Germany",),
+        use_api=True,  # Try API discovery first
+    ),
+    CompanyConfig(
+        name="Stability AI",
+        url="https://stability.ai/careers",
+        keywords=("intern", "internship", "working student"),
+        locations=("Germany", "Remote"),
+        use_api=True,  # Try API discovery first
+    ),
+    CompanyConfig(
+        name="Trusteq",
+        url="https://trusteq-gmbh.jobs.personio.de/?language=de",
+        keywords=("intern", "internship", "werkstudent", "working student", "student"),
+        locations=("Germany",),
+        use_api=True,  # Try API discovery first
+    ),
+    CompanyConfig(
+        name="Capgemini",
+        url="https://www.capgemini.com/de-de/karriere/",
+        keywords=("intern", "internship", "werkstudent", "working student", "student", "praktikum"),
+        locations=("Germany",),
+        use_api=False,  # Disable API - page timeout during discovery
+    ),
+    CompanyConfig(
+        name="Avelios",
+        url="https://www.avelios.com/careers",
+        keywords=("intern", "internship", "werkstudent", "working student", "student"),
+        locations=("Germany", "Munich", "Bavaria"),
+        use_api=True,  # Try API discovery first
+    ),
+    CompanyConfig(
+        name="Valeo",
+        url="https://www.valeo.com/en/career-in-germany/",
+        keywords=("intern", "internship", "werkstudent", "working student", "student", "praktikant"),
+        locations=("Germany",),
+        use_api=True,  # Try API discovery first
+    ),
     
-]
+)
 
 # Legacy format (for backwards compatibility)
 # Will be deprecated - please use COMPANIES above
@@ -136,6 +155,8 @@ SMTP_PORT = 587
 PAGE_LOAD_TIMEOUT = 30000  # milliseconds
 WAIT_FOR_CONTENT_TIMEOUT = 10000  # milliseconds
 HEADLESS_MODE = True
+MAX_CONCURRENT_COMPANIES = 5  # Companies scraped in parallel
+MAX_CONCURRENT_PAGES = 4  # Pooled browser contexts for HTML scraping (reused across companies)
 
 # File paths
 JOBS_DATA_FILE = "jobs_data/jobs_history.json"
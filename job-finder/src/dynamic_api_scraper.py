@@ -5,13 +5,150 @@ Uses discovered API configurations to scrape jobs from any company
 without writing custom scraper code for each one.
 """
 
-import json
 import os
 import re
+import aiohttp
+import orjson
 import requests
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 from pathlib import Path
+from types import MappingProxyType
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from src.utils import JOB_LIST_KEYS, JOB_TITLE_KEYS, JOB_URL_KEYS
+
+try:
+    # Incremental JSON parser (C backend) for streaming large job lists
+    import ijson
+except ImportError:
+    ijson = None
+
+# Parsed api_configs.json per path, keyed by file mtime so every scraper
+# instance in a process shares one read until the file actually changes
+_CONFIG_CACHE: Dict[str, Tuple[int, Dict]] = {}
+
+# Keys tried (in order) when a response_format doesn't say where a field is
+_LOCATION_KEYS = ('location', 'city', 'address', 'place')
+_EMPLOYMENT_TYPE_KEYS = ('employmentType', 'type', 'jobType')
+_DATE_POSTED_KEYS = ('datePosted', 'postedDate', 'publishedDate', 'createdAt')
+
+# Template variables understood by _prepare_payload
+_PLACEHOLDER_RE = re.compile(r'\{(keywords|country|location|max_results|current_time)\}')
+
+
+def _substitute(obj: Any, replacements: Dict[str, str]) -> Any:
+    """Fill template variables in every string of a (nested) payload template."""
+    if isinstance(obj, str):
+        if '{' not in obj:
+            return obj
+        return _PLACEHOLDER_RE.sub(lambda m: replacements[m.group(1)], obj)
+    if isinstance(obj, dict):
+        return {
+            _substitute(key, replacements): _substitute(value, replacements)
+            for key, value in obj.items()
+        }
+    if isinstance(obj, list):
+        return [_substitute(item, replacements) for item in obj]
+    return obj
+
+
+class _RecordingReader:
+    """
+    File-like wrapper that keeps the bytes read until stop() is called.
+    
+    Lets a streamed body be parsed again in full if the expected jobs array
+    never shows up, without buffering the body once it has.
+    """
+    
+    def __init__(self, raw):
+        self._raw = raw
+        self._chunks: Optional[List[bytes]] = []
+    
+    @property
+    def recording(self) -> bool:
+        return self._chunks is not None
+    
+    def read(self, size: int = -1) -> bytes:
+        chunk = self._raw.read(size)
+        if self._chunks is not None:
+            self._chunks.append(chunk)
+        return chunk
+    
+    def stop(self):
+        """Drop what was recorded and stop recording."""
+        self._chunks = None
+    
+    def getvalue(self) -> bytes:
+        """Return the whole body, reading whatever the stream parser left behind."""
+        self._chunks.append(self._raw.read())
+        return b''.join(self._chunks)
+
+
+def _stream_job_items(body: _RecordingReader, jobs_path: str) -> Iterable[Any]:
+    """
+    Yield the items of the array at jobs_path while it streams in.
+    
+    Recording stops as soon as that array starts, so body.recording is still
+    True afterwards only if the response had no list at jobs_path.
+    """
+    def events():
+        for prefix, event, value in ijson.parse(body, use_float=True):
+            if prefix == jobs_path and event == 'start_array' and body.recording:
+                body.stop()
+            yield prefix, event, value
+    
+    return ijson.items(events(), f'{jobs_path}.item')
+
+
+def _compile_path(configured_path: Any, fallback_keys: Iterable[str]) -> Callable[[Any], Any]:
+    """
+    Turn a response_format field spec into a getter function.
+    
+    The spec is interpreted once here instead of on every job: a list is a
+    nested path like ['addresses', 0, 'city'], any other truthy value is a
+    plain key, and no spec means "first of fallback_keys present".
+    """
+    if configured_path:
+        if isinstance(configured_path, list):
+            # Decide per hop now whether it indexes a list or reads a dict key
+            steps = tuple((key, isinstance(key, int)) for key in configured_path)
+            
+            def get_nested(data):
+                value = data
+                for key, is_index in steps:
+                    if is_index:
+                        if not isinstance(value, list) or len(value) <= key:
+                            return None
+                        value = value[key]
+                    elif isinstance(value, dict):
+                        value = value.get(key)
+                    else:
+                        return None
+                return value
+            
+            return get_nested
+        
+        # Simple key
+        return lambda data: data.get(configured_path)
+    
+    keys = tuple(fallback_keys)
+    
+    def get_first(data):
+        return next((data[key] for key in keys if key in data), None)
+    
+    return get_first
+
+
+def _compile_getters(response_format: Dict) -> Dict[str, Callable[[Any], Any]]:
+    """Build the field getters used by _parse_job_item for one response_format."""
+    return {
+        'title': _compile_path(response_format.get('title_field'), JOB_TITLE_KEYS),
+        'location': _compile_path(response_format.get('location_fields'), _LOCATION_KEYS),
+        'url': _compile_path(response_format.get('url_field'), JOB_URL_KEYS),
+        'employment_type': _compile_path(None, _EMPLOYMENT_TYPE_KEYS),
+        'date_posted': _compile_path(None, _DATE_POSTED_KEYS),
+    }
 
 
 class DynamicAPIScraper:
@@ -24,32 +161,83 @@ class DynamicAPIScraper:
                 'api_configs.json'
             )
         self.config_file = config_file
-        self.configs = self._load_configs()
+        self.session = self._create_session()
+        # Read once per scraper; callers share a read-only view and go through
+        # save_config() to change it, so concurrent tasks can't clobber entries
+        self._configs = self._load_configs()
+        self.configs = MappingProxyType(self._configs)
+        # Field getters per company slug, compiled from its response_format
+        self._getters: Dict[str, Dict[str, Callable[[Any], Any]]] = {}
+    
+    @staticmethod
+    def _create_session() -> requests.Session:
+        """Keep-alive session so repeated calls to the same host reuse connections."""
+        # requests already keeps connections alive and advertises gzip, deflate
+        # and br (the latter because the Brotli package is installed)
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=32,
+            pool_maxsize=32,
+            max_retries=Retry(
+                total=2,
+                backoff_factor=0.3,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=None,  # Search APIs are POST; retry them too
+                raise_on_status=False  # Let scrape_jobs report the final status code
+            )
+        )
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+    
+    def close(self):
+        """Release pooled connections."""
+        self.session.close()
     
     def _load_configs(self) -> Dict:
-        """Load all API configurations."""
+        """Load all API configurations (cached until the file changes)."""
         try:
-            with open(self.config_file, 'r') as f:
-                return json.load(f)
+            mtime = os.stat(self.config_file).st_mtime_ns
         except FileNotFoundError:
             return {}
+        
+        cached = _CONFIG_CACHE.get(self.config_file)
+        if cached is None or cached[0] != mtime:
+            cached = (mtime, orjson.loads(Path(self.config_file).read_bytes()))
+            _CONFIG_CACHE[self.config_file] = cached
+        
+        # Copy so save_config on one instance can't leak into another
+        return dict(cached[1])
     
     def _save_configs(self):
         """Save configurations back to file."""
-        with open(self.config_file, 'w') as f:
-            json.dump(self.configs, f, indent=2)
+        Path(self.config_file).write_bytes(
+            orjson.dumps(self._configs, option=orjson.OPT_INDENT_2)
+        )
+        _CONFIG_CACHE[self.config_file] = (
+            os.stat(self.config_file).st_mtime_ns, dict(self._configs)
+        )
     
     def save_config(self, company_slug: str, config: Dict):
         """Save a new API configuration."""
         config['last_verified'] = datetime.utcnow().isoformat() + 'Z'
         config['status'] = 'active'
-        self.configs[company_slug] = config
+        self._configs[company_slug] = config
+        self._getters.pop(company_slug, None)
         self._save_configs()
     
     def get_config(self, company_slug: str) -> Optional[Dict]:
         """Get API configuration for a company."""
         return self.configs.get(company_slug)
     
+    def _getters_for(self, company_slug: str, config: Dict) -> Dict[str, Callable[[Any], Any]]:
+        """Field getters for a company's response_format, compiled on first use."""
+        getters = self._getters.get(company_slug)
+        if getters is None:
+            getters = _compile_getters(config.get('response_format', {}))
+            self._getters[company_slug] = getters
+        return getters
+    
     def scrape_jobs(
         self,
         company_slug: str,
@@ -92,29 +280,108 @@ class DynamicAPIScraper:
                 max_results=max_results
             )
             
+            # Stream just the job items when we know where they live, so large
+            # facet/aggregation blocks in the response are never materialized
+            jobs_path = config.get('response_format', {}).get('jobs_path')
+            stream = ijson is not None and bool(jobs_path)
+            getters = self._getters_for(company_slug, config)
+            
             # Make the request
             if method == 'POST':
-                response = requests.post(
+                response = self.session.post(
                     endpoint,
                     json=payload,
                     headers=headers,
-                    timeout=30
+                    timeout=30,
+                    stream=stream
                 )
             else:  # GET
-                response = requests.get(
+                response = self.session.get(
                     endpoint,
                     params=payload,
                     headers=headers,
-                    timeout=30
+                    timeout=30,
+                    stream=stream
                 )
             
-            if response.status_code != 200:
-                print(f"❌ API returned status {response.status_code}")
-                return []
+            with response:
+                if response.status_code != 200:
+                    print(f"❌ API returned status {response.status_code}")
+                    return []
+                
+                # Parse the response
+                if stream:
+                    response.raw.decode_content = True  # Undo gzip/deflate while streaming
+                    body = _RecordingReader(response.raw)
+                    jobs = self._parse_items(_stream_job_items(body, jobs_path), config, getters)
+                    if body.recording:
+                        # No list at jobs_path in this response - parse the
+                        # whole body so the usual fallbacks apply
+                        data = orjson.loads(body.getvalue())
+                        jobs = self._parse_response(data, config, getters)
+                else:
+                    data = orjson.loads(response.content)
+                    jobs = self._parse_response(data, config, getters)
             
-            # Parse the response
-            data = response.json()
-            jobs = self._parse_response(data, config)
+            print(f"✅ Found {len(jobs)} jobs")
+            return jobs
+            
+        except Exception as e:
+            print(f"❌ Error calling API: {str(e)}")
+            return []
+    
+    async def scrape_jobs_async(
+        self,
+        session: aiohttp.ClientSession,
+        company_slug: str,
+        keywords: List[str] = None,
+        location: str = "DEU",
+        max_results: int = 100
+    ) -> List[Dict]:
+        """
+        Async version of scrape_jobs using a shared aiohttp session.
+        
+        Lets API companies run concurrently on the event loop without a
+        browser or a worker thread.
+        """
+        config = self.get_config(company_slug)
+        
+        if not config:
+            print(f"❌ No API configuration found for '{company_slug}'")
+            return []
+        
+        print(f"📡 Calling {config.get('company_name', company_slug)} API...")
+        
+        try:
+            method = config['method']
+            payload = self._prepare_payload(
+                config.get('payload_template', {}),
+                keywords=keywords,
+                location=location,
+                max_results=max_results
+            )
+            
+            if method == 'POST':
+                request_args = {'json': payload}
+            elif isinstance(payload, dict):  # GET - aiohttp only accepts str/int/float query values
+                request_args = {'params': {k: str(v) for k, v in payload.items()}}
+            else:
+                request_args = {'params': payload or None}
+            
+            async with session.request(
+                method,
+                config['endpoint'],
+                headers=config.get('headers', {}),
+                timeout=aiohttp.ClientTimeout(total=30),
+                **request_args
+            ) as response:
+                if response.status != 200:
+                    print(f"❌ API returned status {response.status}")
+                    return []
+                
+                data = orjson.loads(await response.read())
+            
+            jobs = self._parse_response(data, config, self._getters_for(company_slug, config))
             
             print(f"✅ Found {len(jobs)} jobs")
             return jobs
@@ -134,36 +401,29 @@ class DynamicAPIScraper:
         if not template:
             return {}
         
-        # Convert template to string for replacement
-        template_str = json.dumps(template)
-        
         # Replace common variables
         replacements = {
-            '{keywords}': '|'.join(keywords) if keywords else 'intern|internship',
-            '{country}': location,
-            '{location}': location,
-            '{max_results}': str(max_results),
-            '{current_time}': datetime.utcnow().isoformat() + 'Z'
+            'keywords': '|'.join(keywords) if keywords else 'intern|internship',
+            'country': location,
+            'location': location,
+            'max_results': str(max_results),
+            'current_time': datetime.utcnow().isoformat() + 'Z'
         }
         
-        for key, value in replacements.items():
-            template_str = template_str.replace(key, value)
-        
-        # Parse back to dict
-        try:
-            return json.loads(template_str)
-        except:
-            return template
+        return _substitute(template, replacements)
     
-    def _parse_response(self, data: Dict, config: Dict) -> List[Dict]:
+    def _parse_response(
+        self,
+        data: Dict,
+        config: Dict,
+        getters: Optional[Dict[str, Callable[[Any], Any]]] = None
+    ) -> List[Dict]:
         """
         Parse API response to extract jobs.
         
         Uses response_format from config if available, otherwise tries
         to intelligently detect the job array and fields.
         """
-        jobs = []
-        
         # Try to get response format from config
         response_format = config.get('response_format', {})
         
@@ -174,11 +434,24 @@ class DynamicAPIScraper:
             print("⚠️  Could not find jobs array in response")
             return []
         
+        return self._parse_items(jobs_data, config, getters)
+    
+    def _parse_items(
+        self,
+        jobs_data: Iterable[Dict],
+        config: Dict,
+        getters: Optional[Dict[str, Callable[[Any], Any]]] = None
+    ) -> List[Dict]:
+        """Parse job items (a list or a streaming iterator) into standardized jobs."""
+        jobs = []
+        response_format = config.get('response_format', {})
         company_name = config.get('company_name', 'Unknown')
+        if getters is None:
+            getters = _compile_getters(response_format)
         
         # Parse each job
         for job_data in jobs_data:
-            job = self._parse_job_item(job_data, company_name, response_format)
+            job = self._parse_job_item(job_data, company_name, response_format, getters)
             if job:
                 jobs.append(job)
         
@@ -192,8 +465,7 @@ class DynamicAPIScraper:
             return data[jobs_path]
         
         # Try common paths
-        common_paths = ['value', 'data', 'results', 'jobs', 'items', 'records']
-        for path in common_paths:
+        for path in JOB_LIST_KEYS:
             if path in data:
                 value = data[path]
                 if isinstance(value, list):
@@ -209,22 +481,17 @@ class DynamicAPIScraper:
         self,
         job_data: Dict,
         company_name: str,
-        response_format: Dict
+        response_format: Dict,
+        getters: Optional[Dict[str, Callable[[Any], Any]]] = None
     ) -> Optional[Dict]:
         """Parse a single job item from the response."""
+        if getters is None:
+            getters = _compile_getters(response_format)
+        
         try:
             # Extract fields using config or intelligent detection
-            title = self._extract_field(
-                job_data,
-                response_format.get('title_field'),
-                ['title', 'jobTitle', 'position', 'name']
-            )
-            
-            location = self._extract_field(
-                job_data,
-                response_format.get('location_fields'),
-                ['location', 'city', 'address', 'place']
-            )
+            title = getters['title'](job_data)
+            location = getters['location'](job_data)
             
             # Handle nested location (like MediaMarkt's addresses array)
             if isinstance(location, list) and len(location) > 0:
@@ -234,11 +501,7 @@ class DynamicAPIScraper:
                     country = addr.get('country', '')
                     location = f"{city}, {country}" if city else country
             
-            url = self._extract_field(
-                job_data,
-                response_format.get('url_field'),
-                ['url', 'link', 'href', 'externalPath', 'jobUrl']
-            )
+            url = getters['url'](job_data)
             
             # Add URL prefix if configured
             if url and response_format.get('url_prefix'):
@@ -251,14 +514,8 @@ class DynamicAPIScraper:
                 'title': title or 'Unknown',
                 'location': location or 'Not specified',
                 'url': url or '',
-                'employment_type': self._extract_field(
-                    job_data, None,
-                    ['employmentType', 'type', 'jobType']
-                ) or '',
-                'date_posted': self._extract_field(
-                    job_data, None,
-                    ['datePosted', 'postedDate', 'publishedDate', 'createdAt']
-                ) or ''
+                'employment_type': getters['employment_type'](job_data) or '',
+                'date_posted': getters['date_posted'](job_data) or ''
             }
             
             return job
@@ -2,26 +2,16 @@
 Email notification module using Gmail SMTP.
 """
 import smtplib
+import threading
+from html import escape
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from typing import List, Dict
+from typing import List, Dict, Tuple
 from src.config import SMTP_SERVER, SMTP_PORT, GMAIL_EMAIL, GMAIL_APP_PASSWORD, EMAIL_RECIPIENT
 
-
-def format_job_email(jobs: List[Dict]) -> str:
-    """
-    Format job list into HTML email content.
-    
-    Args:
-        jobs: List of job dictionaries
-        
-    Returns:
-        HTML formatted email body
-    """
-    if not jobs:
-        return ""
-    
-    html_content = """
+# Static parts of the HTML email, built once at import
+# (braces in the CSS are doubled because the header is .format()ted)
+_EMAIL_HEADER = """
     <html>
     <head>
         <style>
@@ -88,19 +78,9 @@ def format_job_email(jobs: List[Dict]) -> str:
         </div>
         <div style="padding: 20px;">
             <p>Found <strong>{count}</strong> new job {posting}:</p>
-    """.format(count=len(jobs), posting="posting" if len(jobs) == 1 else "postings")
-    
-    for job in jobs:
-        html_content += f"""
-            <div class="job-item">
-                <div class="company">{job.get('company', 'Unknown Company')}</div>
-                <div class="title">{job.get('title', 'Unknown Title')}</div>
-                <div class="location">📍 {job.get('location', 'Unknown Location')}</div>
-                <div class="link">🔗 <a href="{job.get('url', '#')}">View Job Posting</a></div>
-            </div>
-        """
-    
-    html_content += """
+    """
+
+_EMAIL_FOOTER = """
         </div>
         <div class="footer">
             This is an automated message from your Job Alert System
@@ -108,8 +88,123 @@ def format_job_email(jobs: List[Dict]) -> str:
     </body>
     </html>
     """
+
+
+# Connection reused across send_email calls (opened lazily, see _get_smtp)
+_smtp_conn = None
+_smtp_lock = threading.Lock()
+
+
+def _get_smtp() -> smtplib.SMTP:
+    """
+    Return a logged-in SMTP connection, reusing the previous one if it is still alive.
     
-    return html_content
+    Must be called with _smtp_lock held.
+    """
+    global _smtp_conn
+    
+    if _smtp_conn is not None:
+        try:
+            if _smtp_conn.noop()[0] == 250:
+                return _smtp_conn
+        except (smtplib.SMTPException, OSError):
+            pass  # Dropped sockets raise OSError (reset, broken pipe), not SMTPException
+        _discard_smtp()
+    
+    print(f"Connecting to Gmail SMTP server...")
+    server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT)
+    try:
+        server.starttls()
+        server.login(GMAIL_EMAIL, GMAIL_APP_PASSWORD)
+    except:
+        _close_quietly(server)
+        raise
+    _smtp_conn = server
+    return server
+
+
+def _close_quietly(server: smtplib.SMTP):
+    """Say goodbye to the server, ignoring a connection that already dropped."""
+    try:
+        server.quit()
+    except:
+        server.close()
+
+
+def _discard_smtp():
+    """Close and forget the shared connection. Must be called with _smtp_lock held."""
+    global _smtp_conn
+    if _smtp_conn is not None:
+        _close_quietly(_smtp_conn)
+        _smtp_conn = None
+
+
+def close_smtp():
+    """Close the shared SMTP connection (safe to call if none is open)."""
+    with _smtp_lock:
+        _discard_smtp()
+
+
+def format_job_email(jobs: List[Dict]) -> str:
+    """
+    Format job list into HTML email content.
+    
+    Args:
+        jobs: List of job dictionaries
+        
+    Returns:
+        HTML formatted email body
+    """
+    if not jobs:
+        return ""
+    
+    return _render_bodies(jobs)[1]
+
+
+def _render_bodies(jobs: List[Dict]) -> Tuple[str, str]:
+    """
+    Build the plain-text and HTML email bodies in one pass over the jobs.
+    
+    Args:
+        jobs: List of job dictionaries (non-empty)
+        
+    Returns:
+        Tuple of (plain text body, HTML body)
+    """
+    posting = "posting" if len(jobs) == 1 else "postings"
+    html_parts = [_EMAIL_HEADER.format(count=len(jobs), posting=posting)]
+    text_parts = [f"New Jobs Found ({len(jobs)} positions):\n\n"]
+    html_append = html_parts.append
+    text_append = text_parts.append
+    separator = "\n" + "-" * 50 + "\n\n"
+    
+    for job in jobs:
+        company = job.get('company')
+        title = job.get('title')
+        location = job.get('location')
+        url = job.get('url')
+        
+        text_append(
+            f"Company: {'Unknown' if company is None else company}\n"
+            f"Title: {'Unknown' if title is None else title}\n"
+            f"Location: {'Unknown' if location is None else location}\n"
+            f"Link: {'N/A' if url is None else url}\n"
+            f"{separator}"
+        )
+        
+        # Scraped text can contain <, & or quotes - escape it so it can't break the markup
+        html_append(f"""
+            <div class="job-item">
+                <div class="company">{escape('Unknown Company' if company is None else str(company))}</div>
+                <div class="title">{escape('Unknown Title' if title is None else str(title))}</div>
+                <div class="location">📍 {escape('Unknown Location' if location is None else str(location))}</div>
+                <div class="link">🔗 <a href="{escape('#' if url is None else str(url), quote=True)}">View Job Posting</a></div>
+            </div>
+        """)
+    
+    html_append(_EMAIL_FOOTER)
+    
+    return "".join(text_parts), "".join(html_parts)
 
 
 def send_email(jobs: List[Dict], recipient_email: str = None) -> bool:
@@ -144,17 +239,8 @@ def send_email(jobs: List[Dict], recipient_email: str = None) -> bool:
         message["From"] = GMAIL_EMAIL
         message["To"] = recipient
         
-        # Create HTML content
-        html_body = format_job_email(jobs)
-        
-        # Create plain text version as fallback
-        text_body = f"New Jobs Found ({len(jobs)} positions):\n\n"
-        for job in jobs:
-            text_body += f"Company: {job.get('company', 'Unknown')}\n"
-            text_body += f"Title: {job.get('title', 'Unknown')}\n"
-            text_body += f"Location: {job.get('location', 'Unknown')}\n"
-            text_body += f"Link: {job.get('url', 'N/A')}\n"
-            text_body += "\n" + "-" * 50 + "\n\n"
+        # Create plain text (fallback) and HTML content together
+        text_body, html_body = _render_bodies(jobs)
         
         # Attach both versions
         part1 = MIMEText(text_body, "plain")
@@ -162,12 +248,14 @@ def send_email(jobs: List[Dict], recipient_email: str = None) -> bool:
         message.attach(part1)
         message.attach(part2)
         
-        # Connect to Gmail SMTP server
-        print(f"Connecting to Gmail SMTP server...")
-        with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
-            server.starttls()
-            server.login(GMAIL_EMAIL, GMAIL_APP_PASSWORD)
-            server.send_message(message)
+        # Send over the shared Gmail SMTP connection
+        with _smtp_lock:
+            try:
+                _get_smtp().send_message(message)
+            except (smtplib.SMTPServerDisconnected, OSError):
+                # Gmail dropped the idle connection between noop and send - retry once
+                _discard_smtp()
+                _get_smtp().send_message(message)
         
         print(f"✅ Email sent successfully to {recipient} with {len(jobs)} job(s)")
         return True
@@ -2,161 +2,230 @@
 Web scraper module using Playwright to extract job postings from company career pages.
 Uses BeautifulSoup for HTML parsing to avoid bot detection.
 """
-from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
-import time
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
+import asyncio
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
 from typing import List, Dict, Optional
-from bs4 import BeautifulSoup
+from functools import partial
 from urllib.parse import urlparse
+import re
+
+try:
+    # Lexbor-based parser, several times faster than BeautifulSoup for link extraction
+    from selectolax.parser import HTMLParser
+except ImportError:
+    HTMLParser = None
+
 from src.config import (
     PAGE_LOAD_TIMEOUT,
+    WAIT_FOR_CONTENT_TIMEOUT,
     HEADLESS_MODE,
+    MAX_CONCURRENT_PAGES,
     JOB_TYPE_KEYWORDS,
     LOCATION_KEYWORDS
 )
+from src.browser_pool import block_heavy_resources
+from src.utils import keyword_pattern, parse_html_without_svg, strip_svg
+
+# Link paths that usually point at a job posting
+_HREF_RE = re.compile(r'job|career|position', re.IGNORECASE)
+_JOB_TYPE_RE = keyword_pattern(JOB_TYPE_KEYWORDS)
+_LOCATION_RE = keyword_pattern(LOCATION_KEYWORDS)
+
+
+async def _launch_browser(p):
+    """Launch Chromium with anti-bot detection measures."""
+    return await p.chromium.launch(
+        headless=HEADLESS_MODE,
+        args=['--disable-blink-features=AutomationControlled']
+    )
+
+
+async def _new_context(browser):
+    """Create a browser context that hides the webdriver property on every page."""
+    context = await browser.new_context(
+        viewport={'width': 1920, 'height': 1080},
+        user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+    )
+    
+    # Skip images, fonts, media and stylesheets - only the links matter here
+    await context.route('**/*', block_heavy_resources)
+    
+    # Hide webdriver property to avoid bot detection
+    await context.add_init_script("""
+        Object.defineProperty(navigator, 'webdriver', {
+            get: () => undefined
+        });
+    """)
+    return context
 
 
 def scrape_jobs(company_name: str, url: str, custom_selectors: Optional[Dict] = None) -> List[Dict]:
     """
     Scrape job listings from a company's career page.
     
+    Launches a browser just for this company; use scrape_all_companies()
+    to share one browser across several companies.
+    
     Args:
         company_name: Name of the company
         url: URL of the careers page
         custom_selectors: Optional dict with custom selectors for this company
         
+    Returns:
+        List of job dictionaries with keys: company, title, location, url
+    """
+    company = {"name": company_name, "url": url, **(custom_selectors or {})}
+    return scrape_all_companies([company])
+
+
+async def _scrape_one(
+    context,
+    company_name: str,
+    url: str,
+    custom_selectors: Optional[Dict] = None,
+    executor: Optional[Executor] = None
+) -> List[Dict]:
+    """
+    Scrape one company's career page in a new page of an existing context.
+    
+    Args:
+        context: Browser context to open the page in
+        company_name: Name of the company
+        url: URL of the careers page
+        custom_selectors: Optional dict with custom selectors for this company
+        executor: Where to run the HTML parse (defaults to the loop's thread pool)
+        
     Returns:
         List of job dictionaries with keys: company, title, location, url
     """
     jobs = []
+    page = None
     
     try:
-        with sync_playwright() as p:
-            # Launch browser with anti-bot detection measures
-            browser = p.chromium.launch(
-                headless=HEADLESS_MODE,
-                args=['--disable-blink-features=AutomationControlled']
-            )
-            try:
-                context = browser.new_context(
-                    viewport={'width': 1920, 'height': 1080},
-                    user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-                )
-                page = context.new_page()
-                
-                # Hide webdriver property to avoid bot detection
-                page.add_init_script("""
-                    Object.defineProperty(navigator, 'webdriver', {
-                        get: () => undefined
-                    });
-                """)
-                
-                print(f"Navigating to {company_name} careers page...")
-                page.goto(url, timeout=PAGE_LOAD_TIMEOUT, wait_until='domcontentloaded')
-                
-                # Wait for dynamic content to load
-                time.sleep(5)
-                
-                # Try to dismiss cookie banners
-                try:
-                    cookie_buttons = [
-                        "button:has-text('Accept')",
-                        "button:has-text('Accept all')",
-                        "button:has-text('Agree')",
-                        "[id*='accept']",
-                        "[class*='accept']"
-                    ]
-                    for selector in cookie_buttons:
-                        try:
-                            if page.locator(selector).count() > 0:
-                                page.locator(selector).first.click(timeout=2000)
-                                time.sleep(1)
-                                break
-                        except:
-                            continue
-                except:
-                    pass
-                
-                # Scroll to load lazy content
-                try:
-                    page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                    time.sleep(2)
-                except:
-                    pass
-                
-                # Get HTML content (safe - doesn't trigger bot detection)
-                print(f"Getting page content for {company_name}...")
-                html_content = page.content()
-                print(f"Retrieved {len(html_content)} characters of HTML")
-                
-                # Parse HTML with BeautifulSoup
-                print(f"Parsing jobs from HTML...")
-                jobs = parse_jobs_from_html(html_content, company_name, url, custom_selectors)
-                print(f"Found {len(jobs)} jobs from {company_name}")
-                
-            except PlaywrightTimeoutError:
-                print(f"Timeout error while scraping {company_name} at {url}")
-            except Exception as e:
-                print(f"Error during scraping {company_name}: {str(e)}")
-            finally:
+        page = await context.new_page()
+        
+        print(f"Navigating to {company_name} careers page...")
+        await page.goto(url, timeout=PAGE_LOAD_TIMEOUT, wait_until='domcontentloaded')
+        
+        # Wait for dynamic content to load - returns as soon as it is there
+        try:
+            if custom_selectors and custom_selectors.get('job_container'):
+                await page.wait_for_selector(custom_selectors['job_container'], timeout=WAIT_FOR_CONTENT_TIMEOUT)
+            else:
+                await page.wait_for_load_state('networkidle', timeout=WAIT_FOR_CONTENT_TIMEOUT)
+        except PlaywrightTimeoutError:
+            pass
+        
+        # Try to dismiss cookie banners
+        try:
+            cookie_buttons = [
+                "button:has-text('Accept')",
+                "button:has-text('Accept all')",
+                "button:has-text('Agree')",
+                "[id*='accept']",
+                "[class*='accept']"
+            ]
+            for selector in cookie_buttons:
                 try:
-                    browser.close()
+                    if await page.locator(selector).count() > 0:
+                        await page.locator(selector).first.click(timeout=2000)
+                        await page.wait_for_load_state('domcontentloaded', timeout=1500)
+                        break
                 except:
-                    pass
-                    
+                    continue
+        except:
+            pass
+        
+        # Scroll to load lazy content
+        try:
+            await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+            await page.wait_for_load_state('networkidle', timeout=3000)
+        except:
+            pass
+        
+        # Get HTML content (safe - doesn't trigger bot detection)
+        print(f"Getting page content for {company_name}...")
+        html_content = await page.content()
+        print(f"Retrieved {len(html_content)} characters of HTML")
+        
+        # Parse HTML off the event loop so the other pages aren't stalled
+        print(f"Parsing jobs from HTML...")
+        jobs = await asyncio.get_running_loop().run_in_executor(
+            executor, _parse_wrapper, (html_content, company_name, url, custom_selectors)
+        )
+        print(f"Found {len(jobs)} jobs from {company_name}")
+        
+    except PlaywrightTimeoutError:
+        print(f"Timeout error while scraping {company_name} at {url}")
     except Exception as e:
-        print(f"Error launching browser for {company_name}: {str(e)}")
+        print(f"Error during scraping {company_name}: {str(e)}")
+    finally:
+        if page is not None:
+            try:
+                await page.close()
+            except:
+                pass
     
     return jobs
 
 
+def _parse_wrapper(args) -> List[Dict]:
+    """Unpack (html, company_name, base_url, custom_selectors) for a process pool worker."""
+    return parse_jobs_from_html(*args)
+
+
 def parse_jobs_from_html(html_content: str, company_name: str, base_url: str, custom_selectors: Optional[Dict] = None) -> List[Dict]:
     """
-    Parse job listings from HTML using BeautifulSoup.
+    Parse job listings from HTML (selectolax, or BeautifulSoup as a fallback).
     Avoids bot detection by not using Playwright DOM queries.
     """
     jobs = []
-    soup = BeautifulSoup(html_content, 'html.parser')
     
     # Simple approach: find all links that might be job postings
     # Look for links containing job-related keywords
-    all_links = soup.find_all('a', href=True)
-    
     job_data_list = []
-    for link in all_links:
-        href = link.get('href', '')
-        text = link.get_text(strip=True)
-        
+    seen = set()
+    
+    # base_url is fixed for the whole page, so resolve its parts once
+    parsed = urlparse(base_url)
+    base_root = f"{parsed.scheme}://{parsed.netloc}"
+    base_rstrip = base_url.rstrip('/')
+    
+    for href, text, get_parent_text in _iter_links(html_content):
         # Skip if empty
         if not text or not href:
             continue
         
+        # Grid and list views often repeat the same link; only handle it once.
+        # Keyed on text too so an "Apply" link can't shadow the titled one.
+        if (href, text) in seen:
+            continue
+        seen.add((href, text))
+        
         # Check if this looks like a job posting
         # (contains job-related paths or has substantial text)
-        if ('job' in href.lower() or 'career' in href.lower() or 
-            'position' in href.lower() or len(text) > 20):
+        if _HREF_RE.search(href) or len(text) > 20:
             
             # Try to extract title and location from the link and surrounding context
             title = text
             location = "Not specified"
             
             # Look for location in parent or sibling elements
-            parent = link.parent
-            if parent:
-                parent_text = parent.get_text(strip=True)
+            if get_parent_text:
+                parent_text = get_parent_text()
                 # Look for common location patterns
-                for keyword in LOCATION_KEYWORDS:
-                    if keyword.lower() in parent_text.lower():
-                        location = parent_text
-                        break
+                if _LOCATION_RE.search(parent_text):
+                    location = parent_text
             
             # Build absolute URL
             if href.startswith('http'):
                 job_url = href
             elif href.startswith('/'):
-                parsed = urlparse(base_url)
-                job_url = f"{parsed.scheme}://{parsed.netloc}{href}"
+                job_url = base_root + href
             else:
-                job_url = f"{base_url.rstrip('/')}/{href.lstrip('/')}"
+                job_url = f"{base_rstrip}/{href.lstrip('/')}"
             
             job_data_list.append({
                 "company": company_name,
@@ -181,17 +250,40 @@ def parse_jobs_from_html(html_content: str, company_name: str, base_url: str, cu
     return jobs
 
 
+def _iter_links(html_content: str):
+    """
+    Yield (href, text, get_parent_text) for every link in the page.
+    
+    get_parent_text is a callable returning the stripped text of the link's
+    parent (None if it has none), so it is only computed for candidate links.
+    Uses selectolax when installed and falls back to BeautifulSoup + lxml.
+    """
+    if HTMLParser is not None:
+        tree = HTMLParser(strip_svg(html_content))  # Same SVG removal as the bs4 path
+        for link in tree.css('a[href]'):
+            parent = link.parent
+            yield (
+                link.attributes.get('href') or '',
+                link.text(strip=True),
+                partial(parent.text, strip=True) if parent else None
+            )
+    else:
+        soup = parse_html_without_svg(html_content)
+        for link in soup.find_all('a', href=True):
+            parent = link.parent
+            yield (
+                link.get('href', ''),
+                link.get_text(strip=True),
+                partial(parent.get_text, strip=True) if parent else None
+            )
+
+
 def is_valid_job_type(job_title: str) -> bool:
     """Check if job title matches allowed job types."""
     if not job_title:
         return False
     
-    title_lower = job_title.lower()
-    for keyword in JOB_TYPE_KEYWORDS:
-        if keyword.lower() in title_lower:
-            return True
-    
-    return False
+    return _JOB_TYPE_RE.search(job_title) is not None
 
 
 def is_valid_location(location: str) -> bool:
@@ -199,25 +291,40 @@ def is_valid_location(location: str) -> bool:
     if not location:
         return False
     
-    location_lower = location.lower()
-    for keyword in LOCATION_KEYWORDS:
-        if keyword.lower() in location_lower:
-            return True
-    
-    return False
+    return _LOCATION_RE.search(location) is not None
 
 
 def scrape_all_companies(company_configs: List[Dict]) -> List[Dict]:
     """
     Scrape jobs from all configured companies.
     
+    Blocking wrapper around scrape_all_companies_async().
+    
     Args:
         company_configs: List of company configuration dictionaries
         
+    Returns:
+        List of all jobs from all companies
+    """
+    return asyncio.run(scrape_all_companies_async(company_configs))
+
+
+async def scrape_all_companies_async(
+    company_configs: List[Dict],
+    max_concurrency: int = MAX_CONCURRENT_PAGES
+) -> List[Dict]:
+    """
+    Scrape jobs from all configured companies, several pages at a time.
+    
+    Args:
+        company_configs: List of company configuration dictionaries
+        max_concurrency: Maximum number of pages open at once
+        
     Returns:
         List of all jobs from all companies
     """
     all_jobs = []
+    targets = []
     
     for company in company_configs:
         company_name = company.get("name")
@@ -233,10 +340,45 @@ def scrape_all_companies(company_configs: List[Dict]) -> List[Dict]:
             if key in company:
                 custom_selectors[key] = company[key]
         
-        jobs = scrape_jobs(company_name, url, custom_selectors if custom_selectors else None)
-        all_jobs.extend(jobs)
-        
-        # Be polite - wait between companies
-        time.sleep(2)
+        targets.append((company_name, url, custom_selectors if custom_selectors else None))
+    
+    if not targets:
+        return all_jobs
+    
+    # Parsing is CPU-bound, so use processes (not threads) to get past the GIL.
+    # A single page isn't worth spawning a worker for; it parses in a thread.
+    executor = None
+    if len(targets) > 1:
+        executor = ProcessPoolExecutor(max_workers=min(len(targets), os.cpu_count() or 1))
+    
+    try:
+        async with async_playwright() as p:
+            # One browser and context for the whole run; each company gets a fresh page
+            browser = await _launch_browser(p)
+            try:
+                context = await _new_context(browser)
+                sem = asyncio.Semaphore(max_concurrency)
+                
+                async def scrape_with_limit(company_name, url, custom_selectors):
+                    async with sem:
+                        return await _scrape_one(context, company_name, url, custom_selectors, executor)
+                
+                # Each company is a different host, so no pause is needed between them
+                results = await asyncio.gather(*[
+                    scrape_with_limit(*target) for target in targets
+                ])
+                for jobs in results:
+                    all_jobs.extend(jobs)
+            finally:
+                try:
+                    await browser.close()
+                except:
+                    pass
+                    
+    except Exception as e:
+        print(f"Error launching browser: {str(e)}")
+    finally:
+        if executor is not None:
+            executor.shutdown()
     
     return all_jobs
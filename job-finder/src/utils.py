@@ -0,0 +1,65 @@
+"""
+Small helpers shared by the scrapers and entry scripts.
+"""
+import functools
+import re
+from typing import Iterable, Pattern
+
+
+def keyword_pattern(keywords: Iterable[str]) -> Pattern:
+    """
+    Compile keywords into one case-insensitive alternation regex.
+    
+    Matching is a plain substring search, same as `keyword.lower() in text.lower()`.
+    Keywords that contain a shorter keyword (e.g. "internship" and "intern")
+    can never change the result, so they are dropped from the alternation.
+    An empty keyword list gives a pattern that never matches.
+    """
+    unique = sorted({k.lower() for k in keywords if k}, key=len)
+    needed = []
+    for keyword in unique:
+        if not any(shorter in keyword for shorter in needed):
+            needed.append(keyword)
+    
+    alternatives = '|'.join(re.escape(k) for k in needed)
+    return re.compile(alternatives or r'(?!)', re.IGNORECASE)
+
+
+# Keys that hold the job list / job fields in career-site JSON APIs. Shared by
+# the JSON capture in async_scraper and the fallbacks in dynamic_api_scraper,
+# so a config saved by one is read back the same way by the other.
+JOB_LIST_KEYS = ('value', 'data', 'results', 'jobs', 'items', 'records', 'postings', 'positions')
+JOB_TITLE_KEYS = ('title', 'jobTitle', 'job_title', 'text', 'position', 'name')
+JOB_URL_KEYS = ('url', 'absolute_url', 'hostedUrl', 'applyUrl', 'link', 'href', 'externalPath', 'jobUrl')
+
+
+_SLUG_RE = re.compile(r'[^a-z0-9]+')
+
+
+@functools.lru_cache(maxsize=1024)
+def slugify(name: str) -> str:
+    """Convert company name to slug."""
+    return _SLUG_RE.sub('-', name.lower()).strip('-')
+
+
+# Inline SVG icons are often the bulk of a careers page's markup and never
+# contain job text, so they are cut out of the HTML string before parsing -
+# a regex scan is far cheaper than building and then walking those nodes.
+# Only whole <svg> elements go: location detection reads each link's parent
+# text. An <svg> can't span another <svg> tag, so a stray "<svg" inside a
+# script never swallows real markup; nested icons fall out one level per pass.
+_SVG_RE = re.compile(r'<svg\b(?:(?!</?svg\b).)*?</svg\s*>', re.IGNORECASE | re.DOTALL)
+
+
+def strip_svg(html_content: str) -> str:
+    """Remove every <svg>...</svg> element from an HTML string."""
+    while True:
+        html_content, removed = _SVG_RE.subn('', html_content)
+        if not removed:
+            return html_content
+
+
+def parse_html_without_svg(html_content: str):
+    """Parse HTML with BeautifulSoup + lxml after cutting out SVG markup."""
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(strip_svg(html_content), 'lxml')  # C parser, much faster than html.parser